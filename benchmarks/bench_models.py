@@ -0,0 +1,133 @@
+"""asv benchmarks of `compute_turing` for every model
+
+    asv run                                   # in fresh environments
+    asv run --python=same --quick -b GridSize # in the current environment
+
+Each benchmark reports the time of `steps` steps, the steps per second,
+the peak memory and the largest memory allocated by a step (traced by
+tracemalloc, 0 for an allocation-free step).
+"""
+
+import time
+import tracemalloc
+
+from napari_turing.Models._model_list import AvailableModels
+from napari_turing.Models._TuringPattern import (
+    Backend,
+    Boundaries,
+    DiffusionDirection,
+)
+
+MODELS = [m.name for m in AvailableModels]
+SIZES = [100, 512, 1024, 4096]
+
+
+def create_model(name, size, **kwargs):
+    model = AvailableModels[name].value
+    params = model.default_parameters()
+    return model(
+        concentrations=model._concentration_names,
+        size=size,
+        seed=0,
+        **params,
+        **kwargs,
+    )
+
+
+def _check_backend(name, backend):
+    """Skips (raising NotImplementedError for asv) the backends that
+    cannot run the model
+    """
+    backend = Backend(backend)
+    if backend == Backend.Numba:
+        from napari_turing.Models._numba_kernels import HAS_NUMBA
+
+        if not HAS_NUMBA:
+            raise NotImplementedError("numba is not installed")
+    model = AvailableModels[name].value
+    if backend in (Backend.Packed, Backend.HashLife) and not model._life_like:
+        raise NotImplementedError(
+            f"{name} cannot use the {backend.value} backend"
+        )
+
+
+class _ComputeTuring:
+    # Number of steps of each measurement
+    steps = 5
+    timeout = 600
+
+    def _setup(self, name, size, **kwargs):
+        self.model = create_model(name, size, **kwargs)
+        # Compiles the numba kernels, allocates the work buffers, ...
+        self.model.compute_turing(1)
+
+    def time_compute_turing(self, *args):
+        self.model.compute_turing(self.steps)
+
+    def peakmem_compute_turing(self, *args):
+        self.model.compute_turing(self.steps)
+
+    def track_steps_per_second(self, *args):
+        start = time.perf_counter()
+        self.model.compute_turing(self.steps)
+        return self.steps / (time.perf_counter() - start)
+
+    track_steps_per_second.unit = "steps/s"
+
+    def track_allocated_bytes_per_step(self, *args):
+        # Largest memory allocated during one of the steps
+        tracemalloc.start()
+        peak = 0
+        for _ in range(self.steps):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            self.model.compute_turing(1)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+        tracemalloc.stop()
+        return peak
+
+    track_allocated_bytes_per_step.unit = "bytes"
+
+
+class GridSize(_ComputeTuring):
+    """Scaling with the grid size of each backend"""
+
+    params = (MODELS, SIZES, [b.value for b in Backend])
+    param_names = ["model", "size", "backend"]
+
+    def setup(self, name, size, backend):
+        _check_backend(name, backend)
+        self._setup(name, size, backend=Backend(backend))
+
+
+class BoundaryConditions(_ComputeTuring):
+    """Cost of each boundary condition and diffusion direction and its
+    scaling with the grid size
+    """
+
+    params = (
+        MODELS,
+        SIZES,
+        [b.value for b in Boundaries],
+        [k.name for k in DiffusionDirection],
+    )
+    param_names = ["model", "size", "boundaries", "kernel"]
+
+    def setup(self, name, size, boundaries, kernel):
+        self._setup(
+            name,
+            size,
+            boundaries=Boundaries(boundaries),
+            kernel=DiffusionDirection[kernel],
+        )
+
+
+class Precision(_ComputeTuring):
+    """float32 against float64 (see also `float32_accuracy.py`)"""
+
+    params = (MODELS, ["float64", "float32"], [b.value for b in Backend])
+    param_names = ["model", "dtype", "backend"]
+
+    def setup(self, name, dtype, backend):
+        _check_backend(name, backend)
+        self._setup(name, 1024, dtype=dtype, backend=Backend(backend))
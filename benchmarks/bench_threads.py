@@ -0,0 +1,56 @@
+"""Scaling of the `Threads` backend with the grid size and the number of
+threads, compared to the single threaded NumPy backend.
+
+    python benchmarks/bench_threads.py [--sizes 512 1024 ...] \
+        [--workers 1 2 4 ...]
+"""
+
+import argparse
+import os
+import time
+
+from napari_turing.Models.GrayScott import GrayScott
+from napari_turing.Models._TuringPattern import Backend
+
+
+def steps_per_second(size, backend, workers=None, steps=10):
+    model = GrayScott(
+        concentrations=GrayScott._concentration_names,
+        size=size,
+        backend=backend,
+        workers=workers,
+        **GrayScott.default_parameters(),
+    )
+    model.compute_turing(1)
+    start = time.perf_counter()
+    model.compute_turing(steps)
+    return steps / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[512, 1024, 2048, 4096, 8192]
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, 8, 16, 32, os.cpu_count() or 1}),
+    )
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>6} {'backend':>8} {'workers':>7} {'steps/s':>9} "
+        f"{'speedup':>8}"
+    )
+    for size in args.sizes:
+        reference = steps_per_second(size, Backend.NumPy, steps=args.steps)
+        print(f"{size:>6} {'NumPy':>8} {1:>7} {reference:>9.2f} {1:>8.2f}")
+        for workers in args.workers:
+            rate = steps_per_second(size, Backend.Threads, workers, args.steps)
+            print(
+                f"{size:>6} {'Threads':>8} {workers:>7} {rate:>9.2f} "
+                f"{rate / reference:>8.2f}"
+            )
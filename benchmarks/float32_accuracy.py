@@ -0,0 +1,65 @@
+"""Accuracy and speed of the float32 models compared to float64.
+
+    python benchmarks/float32_accuracy.py [--steps 1000] [--size 256]
+
+Both runs start from the same initial state (drawn in float64), the error
+is measured on every concentration once the runs are done.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from napari_turing.Models._model_list import AvailableModels
+from napari_turing.Models._TuringPattern import Backend
+
+
+def run(model, dtype, size, steps, backend):
+    params = model.default_parameters()
+    tr = model(
+        concentrations=model._concentration_names,
+        size=size,
+        seed=0,
+        dtype=dtype,
+        backend=backend,
+        **params,
+    )
+    tr.compute_turing(1)
+    start = time.perf_counter()
+    tr.compute_turing(steps - 1)
+    return tr, (steps - 1) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument(
+        "--backend", choices=[b.value for b in Backend], default="NumPy"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'model':>15} {'conc.':>5} {'max abs err':>12} {'rel. L2 err':>12} "
+        f"{'range':>10} {'speedup':>8}"
+    )
+    for m in AvailableModels:
+        backend = Backend(args.backend)
+        tr64, rate64 = run(m.value, np.float64, args.size, args.steps, backend)
+        tr32, rate32 = run(m.value, np.float32, args.size, args.steps, backend)
+        for c in tr64:
+            if not np.issubdtype(tr64[c].dtype, np.floating):
+                print(
+                    f"{m.name:>15} {c:>5} {'not a floating point state':>36}"
+                )
+                continue
+            diff = tr32[c].astype(np.float64) - tr64[c]
+            error = np.linalg.norm(diff) / max(
+                np.linalg.norm(tr64[c]), np.finfo(float).tiny
+            )
+            print(
+                f"{m.name:>15} {c:>5} {np.max(np.abs(diff)):>12.3e} "
+                f"{error:>12.3e} {np.ptp(tr64[c]):>10.3g} "
+                f"{rate32 / rate64:>8.2f}"
+            )
@@ -1,7 +1,6 @@
 from ._TuringPattern import TuringPattern, ModelParameter
-from scipy.ndimage import convolve
 import numpy as np
-from typing import Optional
+from typing import Optional, Tuple
 
 
 class Brusselator(TuringPattern):
@@ -56,34 +55,52 @@ class Brusselator(TuringPattern):
     _tunable_parameters = [A, B, mu_x, mu_y, nb_pos]
     _concentration_names = ["X", "Y"]
 
-    def _reaction(self, c: str) -> np.ndarray:
+    _supports_out = True
+    _numba_kernel = "brusselator"
+
+    def _numba_parameters(self) -> Tuple:
+        return (self.A, self.B, self.mu_x, self.mu_y)
+
+    def _reaction(
+        self, c: str, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        if out is None:
+            out = np.empty_like(self[c])
+        np.multiply(self.X, self.Y, out=out)
         if c == "X":
-            return self.A + self.X**2 * self.Y - self.B * self.X - self.X
+            # A + x^2*y - B*x - x
+            out -= self.B + 1
+            out *= self.X
+            out += self.A
         elif c == "Y":
-            return self.B * self.X - self.X**2 * self.Y
+            # B*x - x^2*y
+            np.subtract(self.B, out, out=out)
+            out *= self.X
+        return out
 
-    def _diffusion(self, c: str) -> np.ndarray:
+    def _diffusion_coefficient(self, c: str) -> float:
         if c == "X":
-            arr = self.X
-            mu = self.mu_x
+            return self.mu_x
         elif c == "Y":
-            arr = self.Y
-            mu = self.mu_y
-        to_cell = convolve(arr, self.kernel.value, mode="constant", cval=0)
-        from_cell = self.nb_neighbs * arr
-        out = mu * (to_cell - from_cell) / (self.dx * self.dy)
-        return out
+            return self.mu_y
+
+    def _diffusion(
+        self, c: str, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        return self._laplacian(
+            self[c], self._diffusion_coefficient(c), out=out
+        )
 
     def init_concentrations(self, C: Optional[str] = None) -> None:
-        pos = (np.random.random((2, self.nb_pos)) * self.size).astype(int)
-        values = np.random.random(self.nb_pos)
+        pos = self._random_positions(self.nb_pos)
+        values = self.rng.random(pos[0].shape)
         if C == "X" or C is None:
-            X = np.ones((self.size, self.size)) * self.A
-            X[pos[0], pos[1]] += values
+            X = np.ones(self.shape) * self.A
+            X[pos] += values
             self["X"] = X
         if C == "Y" or C is None:
-            Y = np.ones((self.size, self.size)) * self.B / self.A
-            Y[pos[0], pos[1]] -= values
+            Y = np.ones(self.shape) * self.B / self.A
+            Y[pos] -= values
             self["Y"] = Y
 
     def __str__(self) -> str:
@@ -1,7 +1,6 @@
 from ._TuringPattern import TuringPattern, ModelParameter
-from scipy.ndimage import convolve
 import numpy as np
-from typing import Optional
+from typing import Optional, Tuple
 
 
 class FitzHughNagumo(TuringPattern):
@@ -46,31 +45,48 @@ class FitzHughNagumo(TuringPattern):
     _tunable_parameters = _necessary_parameters
     _concentration_names = ["A", "I"]
 
-    def _reaction(self, c: str) -> np.ndarray:
-        if c == "A":
-            return self.A - self.A**3 - self.I + self.k
-        elif c == "I":
-            return (self.A - self.I) / self.tau
+    _supports_out = True
+    _numba_kernel = "fitzhugh_nagumo"
 
-    def _diffusion(self, c: str) -> np.ndarray:
+    def _numba_parameters(self) -> Tuple:
+        return (self.mu_a, self.mu_i, self.tau, self.k)
+
+    def _reaction(
+        self, c: str, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        if out is None:
+            out = np.empty_like(self[c])
         if c == "A":
-            arr = self.A
-            mu = self.mu_a
+            # a - a^3 - i + k
+            np.multiply(self.A, self.A, out=out)
+            np.subtract(1, out, out=out)
+            out *= self.A
+            out -= self.I
+            out += self.k
         elif c == "I":
-            arr = self.I
-            mu = self.mu_i
-        to_cell = convolve(arr, self.kernel.value, mode="constant", cval=0)
-        from_cell = self.nb_neighbs * arr
-        out = mu * (to_cell - from_cell) / (self.dx * self.dy)
-        if c == "I":
+            # (a - i) / tau
+            np.subtract(self.A, self.I, out=out)
             out /= self.tau
         return out
 
+    def _diffusion_coefficient(self, c: str) -> float:
+        if c == "A":
+            return self.mu_a
+        elif c == "I":
+            return self.mu_i / self.tau
+
+    def _diffusion(
+        self, c: str, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        return self._laplacian(
+            self[c], self._diffusion_coefficient(c), out=out
+        )
+
     def init_concentrations(self, C: Optional[str] = None) -> None:
         if C == "A" or C is None:
-            self["A"] = np.random.random((self.size, self.size)) * 2 - 1
+            self["A"] = self.rng.random(self.shape) * 2 - 1
         if C == "I" or C is None:
-            self["I"] = np.random.random((self.size, self.size)) * 2 - 1
+            self["I"] = self.rng.random(self.shape) * 2 - 1
 
     def __str__(self) -> str:
         return (
@@ -1,8 +1,12 @@
-from ._TuringPattern import TuringPattern, ModelParameter
+from ._TuringPattern import (
+    TuringPattern,
+    ModelParameter,
+    Boundaries,
+    Backend,
+)
+from ._life_rules import CONWAY, parse_rule, rule_table
 import numpy as np
-from typing import Optional
-from scipy.signal import convolve2d
-from skimage.io import imread
+from typing import Optional, Tuple
 
 # To create your own model you can use this template
 # Some description is given bellow to help you with
@@ -27,13 +31,18 @@ from skimage.io import imread
 class GameOfLife(TuringPattern):
     """Here is a template to create your own Model"""
 
+    # Initial board, an empty board of size `size` is used when it is None
     # default_board = (imread('https://conwaylife.com/w/images/4/49/Turingmachine_large.png') == 0).astype(int)
-    default_board = np.zeros((300, 300), dtype=int)
+    default_board = None
 
-    # Size of the initial grid (larger than 200 might create some latency)
-    default_size = 100
+    # Size of the initial grid
+    default_size = 300
     default_color_map = "gray"
     default_interpolation = "nearest"
+    # The board is a torus by default
+    default_boundaries = Boundaries.Inifinite
+    # The neighbourhood of the rules is a 3x3 square
+    _ndims = (2,)
 
     # Size of a pixel along the x direction
     default_dx = 1
@@ -90,21 +99,32 @@ class GameOfLife(TuringPattern):
             ],
             dtype=int,
         )
-        shape_init = np.array(self.default_board.shape)
+        # The board is copied (for each member of an ensemble)
+        # since it is then updated in place
+        # The packed backend holds the cells in bits, its boards are only
+        # unpacked (to bytes) to be displayed and recorded
+        dtype = np.uint8 if self._packed_board else int
+        if self.default_board is None:
+            board = np.zeros(self.shape, dtype=dtype)
+        else:
+            shape = self.shape[:-2] + self.default_board.shape
+            board = np.broadcast_to(self.default_board, shape).astype(dtype)
+        shape_init = np.array(board.shape[-2:])
         shape_im = np.array(im.shape)
         start = shape_init // 2 - shape_im // 2
         end = start + shape_im
+        board[..., start[0] : end[0], start[1] : end[1]] = im
         if C is None:
-            for ci in self.concentration_names():
-                self[ci] = self.default_board
-                self[ci][start[0] : end[0], start[1] : end[1]] = im
+            for ci in self._concentration_names:
+                self[ci] = board.copy()
         else:
-            self[C] = self.default_board
-            self[C][start[0] : end[0], start[1] : end[1]] = im
+            self[C] = board
 
     # This function allows to display some information about the model
     # in napari
     def __str__(self) -> str:
+        if not self._life_like:
+            return f"Life-like automaton with the rules {self.rule}\n"
         return (
             "Game of Life rules:\n"
             "   - Any live cell with two or three\n"
@@ -124,11 +144,70 @@ class GameOfLife(TuringPattern):
     # model will deal with the concentration names by itself (as long as they are)
     # declared in the function `concentration_names`
 
+    # The terms below can be written into preallocated arrays
+    # (`out` argument) which allows the model to be run without
+    # allocating new arrays at every step
+    _supports_out = True
+    _numba_kernel = "game_of_life"
+    neighbourhood = np.array([[1, 1, 1], [1, 0, 1], [1, 1, 1]])
+
+    # Life-like rule in B/S notation (see `_life_rules.py`), for example
+    # "B36/S23" (HighLife) or "B2/S/C3" (Brian's Brain, with 3 states).
+    # A list of rules runs an ensemble, one rule per member.
+    rule = "B3/S23"
+
+    def _rules(self) -> Tuple[str, ...]:
+        return (self.rule,) if isinstance(self.rule, str) else tuple(self.rule)
+
+    def _init_ensemble(self, ensemble_size: Optional[int]) -> Optional[int]:
+        ensemble_size = super()._init_ensemble(ensemble_size)
+        if not isinstance(self.rule, str):
+            if ensemble_size is None:
+                ensemble_size = len(self.rule)
+            elif len(self.rule) != ensemble_size:
+                raise ValueError(
+                    f"{len(self.rule)} rules for an ensemble of "
+                    f"{ensemble_size} members"
+                )
+        for rule in self._rules():
+            parse_rule(rule)
+        return ensemble_size
+
+    @property
+    def _life_like(self) -> bool:
+        # The packed, HashLife and compiled steps implement B3/S23 only
+        return all(parse_rule(rule) == CONWAY for rule in self._rules())
+
+    @property
+    def _packed_board(self) -> bool:
+        return self.backend == Backend.Packed and self._life_like
+
+    def _numba_ready(self) -> bool:
+        return self._life_like and super()._numba_ready()
+
+    def _rule_lookup(self) -> Tuple[np.ndarray, int, Optional[np.ndarray]]:
+        """Lookup table of the rules (see `rule_table`), number of states
+        and offset of the table of each member of the ensemble (None for a
+        single rule)
+        """
+        rules = self._rules()
+        cached = self.__dict__.get("_rule_cache")
+        if cached is None or cached[0] != rules:
+            table, states = rule_table(rules)
+            offsets = None
+            if 1 < len(rules):
+                offsets = np.arange(len(rules)).reshape(-1, 1, 1) * 9 * states
+            cached = (rules, table, states, offsets)
+            self._rule_cache = cached
+        return cached[1:]
+
     # This function defines the equations of the reactions.
     # It takes as an input which concentration to compute
     # (in this example we have to define how to compute A and I)
-    def _reaction(self, c: str) -> np.ndarray:
-        return -self.Board
+    def _reaction(
+        self, c: str, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        return np.negative(self.Board, out=out)
 
     # This function defines the equations of the diffusion.
     # It takes as an input which concentration to compute
@@ -139,16 +218,26 @@ class GameOfLife(TuringPattern):
     # Neighbors = (left, right, above, below)
     # In the case of oriented diffusion the amount recieved and given to the neighbors
     # is imbalanced according to the position of the neighbor.
-    def _diffusion(self, c: str) -> np.ndarray:
-        kernel = np.array([[1, 1, 1], [1, 0, 1], [1, 1, 1]])
-        nb_neighbs = convolve2d(
-            self.Board, kernel, boundary="wrap", mode="same"
-        )
-        # Checking the rules:
+    def _diffusion(
+        self, c: str, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        if out is None:
+            out = np.empty_like(self.Board)
+        table, states, offsets = self._rule_lookup()
+        # Only the live cells (state 1) are neighbours
+        alive = self.Board if states == 2 else self.Board == 1
+        index = self.__dict__.get("_rule_index")
+        if index is None or index.shape != out.shape:
+            index = np.empty(out.shape, dtype=table.dtype)
+            self._rule_index = index
+        self._neighbour_sum(alive, self.neighbourhood, out=index)
+        # The next state of each cell is read in the lookup table of the
+        # rules at (nb live neighbours, state), e.g. for B3/S23:
         #   Any live cell with two or three live neighbours survives.
         #   Any dead cell with three live neighbours becomes a live cell.
         #   All other live cells die in the next generation. Similarly, all other dead cells stay dead.
-        new_live = np.zeros_like(nb_neighbs, dtype=int)
-        new_live |= (nb_neighbs == 2) & self.Board
-        new_live |= nb_neighbs == 3
-        return new_live
+        index *= states
+        index += self.Board
+        if offsets is not None:
+            index += offsets
+        return np.take(table, index, out=out, mode="clip")
@@ -1,7 +1,6 @@
 from ._TuringPattern import TuringPattern, ModelParameter
-from scipy.ndimage import convolve
 import numpy as np
-from typing import Optional
+from typing import Optional, Tuple
 
 
 class GrayScott(TuringPattern):
@@ -54,31 +53,49 @@ class GrayScott(TuringPattern):
     _tunable_parameters = _necessary_parameters
     _concentration_names = ["X", "Y"]
 
-    def _reaction(self, c: str) -> np.ndarray:
+    _supports_out = True
+    _numba_kernel = "gray_scott"
+
+    def _numba_parameters(self) -> Tuple:
+        return (self.k, self.F, self.mu_x, self.mu_y)
+
+    def _reaction(
+        self, c: str, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        if out is None:
+            out = np.empty_like(self[c])
         if c == "X":
-            return -self.X * self.Y**2 + self.F * (1 - self.X)
+            # -x*y^2 + F*(1 - x)
+            np.multiply(self.Y, self.Y, out=out)
+            out += self.F
+            out *= self.X
+            np.subtract(self.F, out, out=out)
         elif c == "Y":
-            return self.X * self.Y**2 - (self.F + self.k) * self.Y
+            # x*y^2 - (F + k)*y
+            np.multiply(self.X, self.Y, out=out)
+            out -= self.F + self.k
+            out *= self.Y
+        return out
 
-    def _diffusion(self, c: str) -> np.ndarray:
+    def _diffusion_coefficient(self, c: str) -> float:
         if c == "X":
-            arr = self.X
-            mu = self.mu_x
+            return self.mu_x
         elif c == "Y":
-            arr = self.Y
-            mu = self.mu_y
-        to_cell = convolve(arr, self.kernel.value, mode="constant", cval=0)
-        from_cell = self.nb_neighbs * arr
-        out = mu * (to_cell - from_cell) / (self.dx * self.dy)
-        return out
+            return self.mu_y
+
+    def _diffusion(
+        self, c: str, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        return self._laplacian(
+            self[c], self._diffusion_coefficient(c), out=out
+        )
 
     def init_concentrations(self, C: Optional[str] = None) -> None:
         if C == "X" or C is None:
-            self["X"] = np.ones((self.size, self.size))
+            self["X"] = np.ones(self.shape)
         if C == "Y" or C is None:
-            Y = np.zeros((self.size, self.size))
-            pos = (np.random.random((2, self.nb_pos)) * self.size).astype(int)
-            Y[pos[0], pos[1]] = 1
+            Y = np.zeros(self.shape)
+            Y[self._random_positions(self.nb_pos)] = 1
             self["Y"] = Y
 
     def __str__(self) -> str:
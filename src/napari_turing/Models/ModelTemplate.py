@@ -1,7 +1,6 @@
 from ._TuringPattern import TuringPattern, ModelParameter
 import numpy as np
 from typing import Optional
-from scipy.ndimage import convolve
 
 # To create your own model you can use this template
 # Some description is given bellow to help you with
@@ -43,6 +42,8 @@ class ModelTemplate(TuringPattern):
     # If your model ends up having `nan` numbers during its
     # run, you might want to decrease any or all
     # the value of dx, dy and or dt
+    # (or use `integrator=Integrator.Adaptive` which finds the
+    # largest dt that keeps the run stable)
 
     # Below is a list of all the parameters of the model.
     # They need to be listed here so they can be instantiated.
@@ -112,9 +113,9 @@ class ModelTemplate(TuringPattern):
     def init_concentrations(self, C: Optional[str] = None) -> None:
         if C is None:
             for ci in self.concentration_names():
-                self[ci] = np.random.random((self.size, self.size)) * 2 - 1
+                self[ci] = self.rng.random(self.shape) * 2 - 1
         else:
-            self[C] = np.random.random((self.size, self.size)) * 2 - 1
+            self[C] = self.rng.random(self.shape) * 2 - 1
 
     # Declaring the reaction-diffusion equations
     # ------------------------------------------
@@ -124,6 +125,10 @@ class ModelTemplate(TuringPattern):
     # Note that the concentrations do not have to be labeled 'A' and 'I', the
     # model will deal with the concentration names by itself (as long as they are)
     # declared in the function `concentration_names`
+    # If your `_reaction` and `_diffusion` functions accept an `out` array
+    # to write into (see the FitzHughNagumo model) you can set
+    # `_supports_out = True` so the model runs without allocating new
+    # arrays at every step
 
     # This function defines the equations of the reactions.
     # It takes as an input which concentration to compute
@@ -136,6 +141,17 @@ class ModelTemplate(TuringPattern):
             # Below is the reaction part of the equation (2)
             return (self.A - self.I) / self.tau
 
+    # This (optional) function gives the diffusion coefficient of each
+    # concentration. It allows to use the spectral integrator
+    # (`integrator=Integrator.Spectral`) that can run with much larger dt
+    # when the boundaries are `Infinite`
+    def _diffusion_coefficient(self, c: str) -> float:
+        if c == "A":
+            return self.mu_a
+        elif c == "I":
+            # The diffusion of I is divided by tau in equation (2)
+            return self.mu_i / self.tau
+
     # This function defines the equations of the diffusion.
     # It takes as an input which concentration to compute
     # (in this example we have to define how to compute A and I)
@@ -162,7 +178,8 @@ class ModelTemplate(TuringPattern):
             )  # Define the diffusion coefficient for the reageant I
 
         # Computes what is recieved from neighboring cells
-        from_cell = convolve(arr, self.kernel.value, mode="constant", cval=0)
+        # (taking the boundary conditions into account)
+        from_cell = self._neighbour_sum(arr, self.kernel.value)
         # Computes what is given to neighboring cells
         to_cell = self.nb_neighbs * arr
 
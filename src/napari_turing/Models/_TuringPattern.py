@@ -1,11 +1,13 @@
 from abc import abstractmethod
-from typing import Optional, Union, Dict, List, Tuple, Set
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Any, Optional, Union, Dict, List, Tuple, Set
 import numpy as np
-from scipy.ndimage import convolve
-from skimage.transform import resize
-from skimage.color import rgb2gray
 from enum import Enum
 
+# scipy, scikit-image and numba are imported on first use so that
+# importing the models (and opening the plugin) stays fast
+
 
 class ModelParameter:
     def __init__(
@@ -54,6 +56,39 @@ class DiffusionDirection(Enum):
         [0, 2, 0],
     ]
 
+    def stencil(self, ndim: int = 2) -> np.ndarray:
+        """Weights of the neighbours of a cell in `ndim` dimensions, in 3D
+        the kernel applies within the (y, x) planes and the two
+        neighbours along z have a weight of 1 (the 7-point stencil for
+        `Isotrope`)
+        """
+        return _stencil(self, ndim)
+
+
+@lru_cache(maxsize=None)
+def _stencil(kernel: DiffusionDirection, ndim: int) -> np.ndarray:
+    weights = np.asarray(kernel.value)
+    if ndim == 3:
+        plane = weights
+        weights = np.zeros((3, 3, 3), dtype=plane.dtype)
+        weights[1] = plane
+        weights[0, 1, 1] = weights[2, 1, 1] = 1
+    weights.flags.writeable = False
+    return weights
+
+
+def _resize(
+    A: np.ndarray, shape: Tuple[int, ...], mode: str = "reflect"
+) -> np.ndarray:
+    """`A` interpolated (linearly, smoothed when shrinking) on a grid of
+    shape `shape`, its leading axes that are not in `shape` (members of an
+    ensemble) are kept
+    """
+    from skimage.transform import resize
+
+    shape = A.shape[: A.ndim - len(shape)] + tuple(shape)
+    return resize(A, shape, mode=mode)
+
 
 class Boundaries(Enum):
     Closed = "Closed"
@@ -61,6 +96,52 @@ class Boundaries(Enum):
     Top_Down_Tube = "TD-Tube"
     Inifinite = "Infinite"
 
+    @property
+    def wrapped_axes(self) -> Tuple[bool, bool]:
+        """Whether the rows (top-down) and the columns (left-right)
+        are connected at the edges of the grid
+        """
+        return (
+            self.value in ["TD-Tube", "Infinite"],
+            self.value in ["LR-Tube", "Infinite"],
+        )
+
+    def wrapped(self, ndim: int = 2) -> Tuple[bool, ...]:
+        """Whether each axis of an `ndim` dimensional grid is connected at
+        its edges, in 3D the z axis is connected for Infinite boundaries
+        """
+        if ndim == 3:
+            return (self.value == "Infinite",) + self.wrapped_axes
+        return self.wrapped_axes
+
+
+class Integrator(Enum):
+    # Explicit Euler scheme, stable only for small dt
+    Euler = "Euler"
+    # Semi-implicit Euler scheme, the diffusion is solved implicitly in
+    # Fourier space and the reaction explicitly (periodic boundaries only)
+    Spectral = "Spectral"
+    # Heun-Euler scheme with an embedded error estimate, dt is adapted at
+    # every step (and `compute_turing` rolls back non-finite steps)
+    Adaptive = "Adaptive"
+
+
+class Backend(Enum):
+    NumPy = "NumPy"
+    # Compiled loop fusing reaction, diffusion and update (requires numba)
+    Numba = "Numba"
+    # Bands of rows stepped by a pool of threads (see `_bands.py`)
+    Threads = "Threads"
+    # Board packed into 64 bit words updated with bitwise operations
+    # (Game of Life only, see `_packed_life.py`)
+    Packed = "Packed"
+    # Memoized quadtree jumping 2^k generations at once, on an unbounded
+    # plane (Game of Life only, see `_hashlife.py`)
+    HashLife = "HashLife"
+    # Only the tiles of the grid that are not at rest are stepped (see
+    # `_tiles.py`)
+    Tiles = "Tiles"
+
 
 class TuringPattern:
     """docstring for TuringPattern"""
@@ -75,6 +156,16 @@ class TuringPattern:
     _tunable_parameters = []
     _concentration_names = []
     default_contrast_limits = None
+    default_boundaries = Boundaries.Closed
+    default_kernel = DiffusionDirection.Isotrope
+    # Relative error allowed per step by the adaptive integrator
+    default_tolerance = 1e-3
+    default_dtype = np.float64
+    # Number of dimensions of the grid and those the model supports
+    default_ndim = 2
+    _ndims = (2, 3)
+    # Whether some cells are outside of the domain (see `set_mask`)
+    masked = False
 
     increment = ModelParameter(
         name="Increment",
@@ -84,14 +175,50 @@ class TuringPattern:
         description="Number of steps per frame",
     )
 
+    # Set to True by models whose `_reaction` and `_diffusion` accept an
+    # `out` array to write into, which enables the allocation-free stepper
+    _supports_out = False
+    # Set to True by the models following the rules of the Game of Life
+    # on a binary board, which can then use the `Packed` and `HashLife`
+    # backends
+    _life_like = False
+    # Maximum number of nodes kept by the HashLife backend
+    hashlife_max_nodes = 2**20
+    # Side of the tiles of the Tiles backend, fraction of active tiles
+    # above which the whole grid is stepped and largest increment of a
+    # tile at rest
+    tile_size = 32
+    dense_fraction = 0.5
+    tile_tolerance = 0
+    # Name of the compiled step of the model in `_numba_kernels.py` and
+    # the function giving its model specific arguments
+    _numba_kernel = None
+
+    def _numba_parameters(self) -> Tuple:
+        return ()
+
     @abstractmethod
-    def _reaction(self, c: str) -> np.ndarray:
+    def _reaction(
+        self, c: str, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         return self[c]
 
     @abstractmethod
-    def _diffusion(self, c: str) -> np.ndarray:
+    def _diffusion(
+        self, c: str, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         return self[c]
 
+    def _diffusion_coefficient(self, c: str) -> Union[float, np.ndarray]:
+        """Diffusion coefficient of the concentration `c` such that
+        `_diffusion(c)` is `_laplacian(self[c], _diffusion_coefficient(c))`.
+        Necessary for the spectral integrator only.
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not declare the diffusion "
+            "coefficients of its concentrations"
+        )
+
     def reaction(self) -> List[np.ndarray]:
         dC = []
         for c in self.concentrations:
@@ -104,33 +231,840 @@ class TuringPattern:
             diffC.append(self._diffusion(c))
         return diffC
 
-    def compute_turing(self, n=5):
-        for _ in range(n):
-            reaction = self.reaction()
-            diffusion = self.diffusion()
-            for i, c in enumerate(self):
-                self[c] = self[c] + self.dt * (reaction[i] + diffusion[i])
-                if self.boundaries.value in ["LR-Tube", "Infinite"]:
-                    tmp = self[c][:, -1].copy()
-                    self[c][:, -1] = self[c][:, 0]
-                    self[c][:, 0] = tmp
-                    del tmp
-                if self.boundaries.value in ["TD-Tube", "Infinite"]:
-                    tmp = self[c][-1, :].copy()
-                    self[c][-1, :] = self[c][0, :]
-                    self[c][0, :] = tmp
-                    del tmp
+    def _neighbour_sum(
+        self,
+        arr: np.ndarray,
+        kernel: Union[np.ndarray, list],
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Kernel-weighted sum of the neighbours of each cell of `arr`,
+        the boundary conditions being applied within the convolution
+        """
+        from scipy.ndimage import convolve
+
+        kernel = np.asarray(kernel)
+        # Members of an ensemble are stacked along the first axis
+        weights = kernel.reshape(
+            (1,) * (arr.ndim - kernel.ndim) + kernel.shape
+        )
+        wrapped = self.boundaries.wrapped(kernel.ndim)
+        if not any(wrapped):
+            return convolve(arr, weights, output=out, mode="constant", cval=0)
+        out = convolve(arr, weights, output=out, mode="wrap")
+        # Closed sides of a tube: removing what was received from the
+        # opposite side of the grid (only the edge cells are touched)
+        for axis, wrap in enumerate(wrapped):
+            if wrap:
+                continue
+            after = (slice(None),) * (kernel.ndim - axis - 1)
+            for edge, opposite, k in [(0, -1, 2), (-1, 0, 0)]:
+                received = kernel[(slice(None),) * axis + (k,)]
+                received = received.reshape(
+                    (1,) * (arr.ndim - kernel.ndim) + received.shape
+                )
+                out[(Ellipsis, edge) + after] -= convolve(
+                    arr[(Ellipsis, opposite) + after], received, mode="wrap"
+                )
+        return out
+
+    def _laplacian(
+        self, arr: np.ndarray, mu: float, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Diffusion of `arr` with coefficient `mu` according to the kernel,
+        written into `out` (allocated if not given)
+        """
+        scratch = self._work_buffers()[1]
+        # What is received from the neighbouring cells
+        out = self._neighbour_sum(arr, self.kernel.stencil(self.ndim), out=out)
+        # What is given to the neighbouring cells
+        np.multiply(self.nb_neighbs, arr, out=scratch)
+        out -= scratch
+        out *= mu / (self.dx * self.dy)
+        return out
+
+    @property
+    def boundaries(self) -> Boundaries:
+        return self._boundaries
+
+    @boundaries.setter
+    def boundaries(self, boundaries: Boundaries) -> None:
+        self._boundaries = boundaries
+        self._nb_neighbs = None
+
+    @property
+    def kernel(self) -> DiffusionDirection:
+        return self._kernel
+
+    @kernel.setter
+    def kernel(self, kernel: DiffusionDirection) -> None:
+        self._kernel = kernel
+        self._nb_neighbs = None
+
+    @property
+    def nb_neighbs(self) -> np.ndarray:
+        """Number of neighbours (weighted by the kernel) of each cell,
+        it depends on the boundary conditions and on the kernel
+        """
+        if self._nb_neighbs is None:
+            self._nb_neighbs = self._neighbour_sum(
+                self.mask, self.kernel.stencil(self.ndim)
+            )
+        return self._nb_neighbs
+
+    def _work_buffers(
+        self,
+    ) -> Tuple[Dict[str, Tuple[np.ndarray, np.ndarray]], np.ndarray]:
+        """Preallocated reaction and diffusion buffers for each concentration
+        and a shared scratch array, (re)allocated only when the
+        concentrations change shape or dtype
+        """
+        work = self.__dict__.get("_work")
+        ref = self[self.concentrations[0]]
+        if work is None or any(
+            work[0][c][0].shape != self[c].shape
+            or work[0][c][0].dtype != self[c].dtype
+            for c in self
+        ):
+            buffers = {
+                c: (np.empty_like(self[c]), np.empty_like(self[c]))
+                for c in self
+            }
+            scratch = np.empty(ref.shape, np.result_type(ref, np.float32))
+            work = (buffers, scratch)
+            self._work = work
+        return work
+
+    def _step(self) -> None:
+        reaction = self.reaction()
+        diffusion = self.diffusion()
+        for i, c in enumerate(self):
+            increment = self.dt * (reaction[i] + diffusion[i])
+            if self.masked:
+                increment *= self.mask
+            self[c] = self[c] + increment
+
+    def _derivatives(
+        self, out: Optional[Dict[str, np.ndarray]] = None
+    ) -> Dict[str, np.ndarray]:
+        """reaction + diffusion of every concentration written into `out`
+        (the reaction work buffers by default), 0 outside of the domain
+        """
+        buffers = self._work_buffers()[0]
+        if out is None:
+            out = {c: buffers[c][0] for c in self}
+        for c in self:
+            if self._supports_out:
+                self._reaction(c, out=out[c])
+                out[c] += self._diffusion(c, out=buffers[c][1])
+            else:
+                out[c][...] = self._reaction(c) + self._diffusion(c)
+            if self.masked:
+                out[c] *= self.mask
+        return out
+
+    def _step_inplace(self) -> None:
+        # All the terms are computed before any concentration is updated
+        derivatives = self._derivatives()
+        for c in self:
+            derivatives[c] *= self.dt
+            self[c] += derivatives[c]
 
     @staticmethod
-    def normalizing_input_image(A: np.ndarray, size: int):
-        if len(A.shape) != 2 and not A.shape[-1] in (3, 4):
-            print(f"Input images should be 2 dimensional ({A.shape=})")
+    def _has_numba() -> bool:
+        from ._numba_kernels import HAS_NUMBA
+
+        return HAS_NUMBA
+
+    def _numba_ready(self) -> bool:
+        kernel = np.asarray(self.kernel.value)
+        return (
+            self._numba_kernel is not None
+            and self._has_numba()
+            and self.ndim == 2
+            and not self.masked
+            and self[self.concentrations[0]].ndim == len(self.shape)
+            and not kernel[::2, ::2].any()
+        )
+
+    def _step_numba(self) -> None:
+        from . import _numba_kernels
+
+        compiled_step = getattr(_numba_kernels, self._numba_kernel)
+        back = self.__dict__.get("_numba_back")
+        if back is None or any(
+            back[c].shape != self[c].shape or back[c].dtype != self[c].dtype
+            for c in self
+        ):
+            back = {c: np.empty_like(self[c]) for c in self}
+            self._numba_back = back
+        # The scalars are given in the precision of the model so that the
+        # kernels compute in that precision
+        cast = self.dtype.type
+        kernel = np.asarray(self.kernel.value, dtype=self.dtype)
+        weights = np.array(
+            [kernel[0, 1], kernel[2, 1], kernel[1, 0], kernel[1, 2]]
+        )
+        wrap_rows, wrap_columns = self.boundaries.wrapped_axes
+        nb_neighbs = self.nb_neighbs
+        parameters = self._numba_parameters()
+        # The members of an ensemble are run one after the other
+        for m in range(self.ensemble_size or 1):
+            index = () if self.ensemble_size is None else (m,)
+            compiled_step(
+                *[self[c][index] for c in self],
+                *[back[c][index] for c in self],
+                nb_neighbs,
+                weights,
+                wrap_rows,
+                wrap_columns,
+                cast(self.dt),
+                cast(self.dx * self.dy),
+                *[
+                    cast(p if np.ndim(p) == 0 else np.ravel(p)[m])
+                    for p in parameters
+                ],
+            )
+        # Double buffering, the new concentrations were written in `back`
+        for c in self:
+            self[c], back[c] = back[c], self[c]
+
+    def stable_dt(self) -> float:
+        """Largest dt for which the explicit diffusion is stable, estimated
+        from the diffusion coefficients, dx, dy and the kernel (inf when the
+        model does not declare its diffusion coefficients)
+        """
+        try:
+            mu = max(
+                np.max(np.abs(self._diffusion_coefficient(c))) for c in self
+            )
+        except NotImplementedError:
+            return np.inf
+        if mu == 0:
+            return np.inf
+        # The eigenvalues of the discrete operator are bounded by
+        # 2 * sum(kernel) / (dx * dy), explicit schemes need dt * |L| <= 2
+        return (
+            self.dx * self.dy / (np.sum(self.kernel.stencil(self.ndim)) * mu)
+        )
+
+    def _step_adaptive(self) -> None:
+        work = self.__dict__.get("_adaptive_work")
+        if work is None or any(
+            work[c][0].shape != self[c].shape for c in self
+        ):
+            work = {
+                c: tuple(np.empty_like(self[c]) for _ in range(3))
+                for c in self
+            }
+            self._adaptive_work = work
+        start = {c: work[c][0] for c in self}
+        k1 = {c: work[c][1] for c in self}
+        k2 = {c: work[c][2] for c in self}
+        for c in self:
+            start[c][...] = self[c]
+        self._derivatives(k1)
+        max_dt = 0.9 * self.stable_dt()
+        while True:
+            dt = float(min(self.dt, max_dt))
+            # Euler step
+            for c in self:
+                np.multiply(k1[c], dt, out=self[c])
+                self[c] += start[c]
+            self._derivatives(k2)
+            # Heun step, the difference with the Euler step is the error
+            error = 0
+            for c in self:
+                k2[c] -= k1[c]
+                k2[c] *= dt / 2
+                self[c] += k2[c]
+                scale = self.tolerance * (1 + np.max(np.abs(self[c])))
+                error_c = np.max(np.abs(k2[c])) / scale
+                if not (np.isfinite(scale) and np.isfinite(error_c)):
+                    error = np.inf
+                else:
+                    error = max(error, error_c)
+            if np.isfinite(error) and error <= 1:
+                factor = 0.9 / np.sqrt(max(error, 1e-4))
+                self.dt = float(min(dt * min(factor, 5), max_dt))
+                return
+            # Rejected step: rolling back and retrying with a smaller dt
+            for c in self:
+                self[c][...] = start[c]
+            if np.isfinite(error):
+                self.dt = float(dt * max(0.9 / np.sqrt(error), 0.2))
+            else:
+                self.dt = dt * 0.2
+            if self.dt < 1e-6 * self.default_dt:
+                raise FloatingPointError(
+                    "The adaptive integrator could not find a time step "
+                    f"small enough to keep the concentrations finite ({dt=})"
+                )
+
+    def _spectral_operator(self, c: str) -> np.ndarray:
+        """Fourier multiplier of the implicit diffusion of `c`, that is
+        1 / (1 - dt * mu * L(k)) where L(k) is the symbol of the (periodic)
+        discrete diffusion operator. Cached until the parameters change.
+        """
+        mu = self._diffusion_coefficient(c)
+        key = (
+            self.dt,
+            self.dx,
+            self.dy,
+            self.kernel,
+            self[c].shape,
+            np.asarray(mu).tobytes(),
+        )
+        cache = self.__dict__.setdefault("_spectral_cache", {})
+        if c in cache and cache[c][0] == key:
+            return cache[c][1]
+        # The symbol is the transfer function of the operator,
+        # i.e. the Fourier transform of its impulse response
+        from scipy import fft
+
+        stencil = self.kernel.stencil(self.ndim)
+        impulse = np.zeros(self[c].shape[-self.ndim :])
+        impulse[(0,) * self.ndim] = 1
+        response = self._neighbour_sum(impulse, stencil)
+        response[(0,) * self.ndim] -= np.sum(stencil)
+        symbol = fft.rfftn(response) / (self.dx * self.dy)
+        operator = 1 / (1 - self.dt * np.asarray(mu) * symbol)
+        # complex64 for a float32 model
+        operator = operator.astype(np.result_type(self[c], np.complex64))
+        cache[c] = (key, operator)
+        return operator
+
+    def _step_spectral(self) -> None:
+        if self.boundaries != Boundaries.Inifinite:
+            raise ValueError(
+                "The spectral integrator requires Infinite boundaries"
+            )
+        if self.masked:
+            raise ValueError(
+                "The spectral integrator cannot run on a masked domain"
+            )
+        from scipy import fft
+
+        axes = tuple(range(-self.ndim, 0))
+        buffers = self._work_buffers()[0]
+        reactions = {}
+        for c in self:
+            if self._supports_out:
+                reactions[c] = self._reaction(c, out=buffers[c][0])
+            else:
+                reactions[c] = self._reaction(c)
+        for c in self:
+            # Explicit part: C + dt * reaction
+            explicit = buffers[c][1]
+            np.multiply(reactions[c], self.dt, out=explicit)
+            explicit += self[c]
+            C = fft.rfftn(explicit, axes=axes, workers=-1)
+            C *= self._spectral_operator(c)
+            self[c][...] = fft.irfftn(
+                C, s=self[c].shape[-self.ndim :], axes=axes, workers=-1
+            )
+
+    def _release_packed(self) -> None:
+        engine = self.__dict__.pop("_packed", None)
+        if engine is not None:
+            engine.release()
+
+    def _release_tiles(self) -> None:
+        tiles = self.__dict__.get("_tiles")
+        if tiles is not None:
+            tiles.release()
+
+    def _domain_stepper(self) -> Optional[str]:
+        """How a masked model whose domain covers at most `dense_fraction`
+        of the grid steps its domain only: "tiles" for the 2D Euler runs
+        of a single model, "box" (see `_cropped`) otherwise. None if the
+        whole grid is stepped.
+        """
+        if not self.masked or self.integrator == Integrator.Spectral:
+            return None
+        key = (self.backend, self.integrator, self.boundaries)
+        key += (self.dense_fraction,)
+        cached = self.__dict__.get("_domain_route")
+        if cached is not None and cached[0] is self.mask and cached[1] == key:
+            return cached[2]
+        if (
+            self.integrator == Integrator.Euler
+            and self.ensemble_size is None
+            and self.ndim == 2
+        ):
+            route, fraction = "tiles", float(self.mask.mean())
+        else:
+            box = self._domain_box()
+            route, fraction = "box", 1.0
+            if box is not None:
+                fraction = np.prod([b.stop - b.start for b in box])
+                fraction /= self.size**self.ndim
+        if self.dense_fraction < fraction:
+            route = None
+        elif self.backend not in (Backend.NumPy, Backend.Tiles):
+            print(
+                f"The domain covers {fraction:.0%} of the grid, stepping "
+                + ("its tiles" if route == "tiles" else "its bounding box")
+                + f" rather than the whole grid with the {self.backend.value}"
+                " backend"
+            )
+        self._domain_route = (self.mask, key, route)
+        return route
+
+    def _domain_box(self) -> Optional[Tuple[slice, ...]]:
+        """Bounding box of the domain and of a halo of one cell around it
+        (None if it is the whole grid). The box spans the wrapped axes
+        whose edges it reaches, the domain being connected through them.
+        """
+        box = []
+        wrapped = self.boundaries.wrapped(self.ndim)
+        for axis in range(self.ndim):
+            others = tuple(a for a in range(self.ndim) if a != axis)
+            cells = np.flatnonzero(self.mask.any(axis=others))
+            if cells.size == 0:
+                return None
+            start = max(cells[0] - 1, 0)
+            stop = min(cells[-1] + 2, self.size)
+            if wrapped[axis] and (start == 0 or stop == self.size):
+                start, stop = 0, self.size
+            box.append(slice(start, stop))
+        if all(b.stop - b.start == self.size for b in box):
+            return None
+        return tuple(box)
+
+    def _cropped(self):
+        """Shallow copy of the masked model whose concentrations are the
+        views of the bounding box of its domain (None if it is the whole
+        grid), the cells outside of the domain being 0 the box steps as
+        the whole grid
+        """
+        from ._bands import copy_parameters, make_proxy
+
+        key = (self.mask, self.boundaries, self.kernel)
+        cached = self.__dict__.get("_crop")
+        if cached is None or any(a is not b for a, b in zip(cached[0], key)):
+            box = self._domain_box()
+            proxy = None
+            if box is not None:
+                proxy = make_proxy(self)
+                proxy.boundaries = self.boundaries
+                proxy.mask = self.mask[box]
+                proxy.masked = True
+                proxy._nb_neighbs = self.nb_neighbs[box]
+            cached = (key, box, proxy)
+            self._crop = cached
+        _, box, proxy = cached
+        if proxy is not None:
+            copy_parameters(self, proxy)
+            for c in self:
+                proxy[c] = self[c][(Ellipsis,) + box]
+        return proxy
+
+    def _advance(self, n: int) -> None:
+        if (
+            self.backend == Backend.Packed
+            and self._life_like
+            and not self.masked
+        ):
+            from ._packed_life import PackedLife
+
+            engine = self.__dict__.get("_packed")
+            if engine is None or not engine.matches(self):
+                self._release_packed()
+                engine = PackedLife(self)
+                self._packed = engine
+            with self._phase("step"):
+                engine.run(n)
+            return
+        # The other backends step the board of the model
+        self._release_packed()
+        if (
+            self.backend == Backend.HashLife
+            and self._life_like
+            and not self.masked
+        ):
+            from ._hashlife import HashLife
+
+            engine = self.__dict__.get("_hashlife")
+            if engine is None or not engine.matches(self):
+                engine = HashLife(self, self.hashlife_max_nodes)
+                self._hashlife = engine
+            self._release_tiles()
+            with self._phase("step"):
+                engine.run(n)
+            return
+        # A small domain is stepped by its tiles (masked 2D grid) or by its
+        # bounding box (other masked grids)
+        route = self._domain_stepper()
+        if (
+            self.integrator == Integrator.Euler
+            and (self.backend == Backend.Tiles or route == "tiles")
+            and self.ensemble_size is None
+            and self.ndim == 2
+        ):
+            from ._tiles import ActiveTiles
+
+            tiles = self.__dict__.get("_tiles")
+            options = (
+                self.tile_size,
+                self.dense_fraction,
+                self.tile_tolerance,
+            )
+            if tiles is None or not tiles.matches(self, *options):
+                tiles = ActiveTiles(self, *options)
+                self._tiles = tiles
+            with self._phase("step"):
+                tiles.run(n)
+            # Number of tiles stepped at each step
+            self.active_tiles = tiles.active_tiles
+            return
+        self._release_tiles()
+        if route == "box":
+            cropped = self._cropped()
+            if cropped is not None:
+                cropped._profiler = self.__dict__.get("_profiler")
+                cropped._step_all(n)
+                self.dt = cropped.dt
+                return
+        if (
+            self.integrator == Integrator.Euler
+            and self.backend == Backend.Threads
+            and self.ndim == 2
+        ):
+            from ._bands import RowBands
+
+            bands = self.__dict__.get("_bands")
+            if bands is None or not bands.matches(self, self.workers):
+                bands = RowBands(self, self.workers)
+                self._bands = bands
+            bands.run(n)
+            return
+        self._step_all(n)
+
+    def _step_all(self, n: int) -> None:
+        """`n` steps of the whole grid"""
+        if self.integrator == Integrator.Spectral:
+            step = self._step_spectral
+        elif self.integrator == Integrator.Adaptive:
+            step = self._step_adaptive
+        elif self.backend == Backend.Numba and self._numba_ready():
+            step = self._step_numba
+        elif self._supports_out:
+            step = self._step_inplace
+        else:
+            step = self._step
+        profiler = self.__dict__.get("_profiler")
+        if profiler is not None and step in (self._step_inplace, self._step):
+            for _ in range(n):
+                self._step_profiled(profiler)
+            return
+        with self._phase("step"):
+            for _ in range(n):
+                step()
+
+    def _step_profiled(self, profiler) -> None:
+        """`_step_inplace` timing the reaction, the diffusion and the
+        update of the concentrations
+        """
+        buffers = self._work_buffers()[0]
+        derivatives = {c: buffers[c][0] for c in self}
+        for c in self:
+            with profiler.phase("reaction"):
+                if self._supports_out:
+                    self._reaction(c, out=derivatives[c])
+                else:
+                    derivatives[c][...] = self._reaction(c)
+            with profiler.phase("diffusion"):
+                if self._supports_out:
+                    derivatives[c] += self._diffusion(c, out=buffers[c][1])
+                else:
+                    derivatives[c] += self._diffusion(c)
+        with profiler.phase("update"):
+            for c in self:
+                derivatives[c] *= self.dt
+                if self.masked:
+                    derivatives[c] *= self.mask
+                self[c] += derivatives[c]
+
+    def _phase(self, name: str):
+        """Context measuring the phase `name` when the model is profiled"""
+        profiler = self.__dict__.get("_profiler")
+        if profiler is None:
+            return nullcontext()
+        return profiler.phase(name)
+
+    def _compute(self, n: int) -> None:
+        recorder = self.__dict__.get("_recorder")
+        profiler = self.__dict__.get("_profiler")
+        while 0 < n:
+            chunk = n
+            if recorder is not None:
+                chunk = min(n, recorder.steps_to_next(self.steps))
+            if profiler is None:
+                self._advance(chunk)
+            elif profiler.memory:
+                # The memory allocated is measured step by step
+                for _ in range(chunk):
+                    with profiler.computing(1):
+                        self._advance(1)
+            else:
+                with profiler.computing(chunk):
+                    self._advance(chunk)
+            self.steps += chunk
+            n -= chunk
+            if recorder is not None and self.steps % recorder.every == 0:
+                with self._phase("record"):
+                    recorder.record(self)
+
+    def _relative_change(self, previous: Dict[str, np.ndarray]) -> float:
+        # Unsigned boards (packed Game of Life) are subtracted as floats
+        return max(
+            float(
+                np.linalg.norm(
+                    np.subtract(
+                        self[c],
+                        previous[c],
+                        dtype=np.promote_types(self[c].dtype, np.float32),
+                    )
+                )
+                / max(np.linalg.norm(previous[c]), np.finfo(float).tiny)
+            )
+            for c in self
+        )
+
+    def compute_turing(
+        self,
+        n: int = 5,
+        tol: Optional[float] = None,
+        check_every: int = 100,
+        max_period: int = 4,
+    ) -> int:
+        """Computes `n` steps and returns the number of steps computed
+        since the initial state.
+
+        If `tol` is given, the state is compared every `check_every` steps
+        with the states of the last `max_period` checks and the computation
+        stops early once the relative change (norm of the difference over
+        norm of the old state, the largest over the concentrations) from
+        one of them is below `tol`: a steady state when it is the last
+        check, a periodic regime otherwise. `self.convergence` tells
+        whether the last call stopped early, the last relative change and the
+        number of steps after which the state comes back (None for a
+        steady state).
+        """
+        self.convergence = {
+            "converged": False,
+            "relative_change": None,
+            "period": None,
+        }
+        if tol is None:
+            self._compute(n)
+            return self.steps
+        # Checked states and the step at which they were reached
+        checks = [({c: self[c].copy() for c in self}, self.steps)]
+        while 0 < n:
+            # The last chunk can be shorter than `check_every`
+            chunk = min(n, check_every)
+            self._compute(chunk)
+            n -= chunk
+            changes = [
+                (self._relative_change(state), steps)
+                for state, steps in reversed(checks)
+            ]
+            self.convergence["relative_change"] = changes[0][0]
+            for k, (change, steps) in enumerate(changes):
+                # The change from the last check is compared to the
+                # tolerance of `check_every` steps
+                if change < (tol * chunk / check_every if k == 0 else tol):
+                    self.convergence["converged"] = True
+                    if 0 < k:
+                        self.convergence["period"] = self.steps - steps
+                    return self.steps
+            # The oldest state is recycled for the current one
+            if len(checks) < max_period:
+                checks.append(({c: self[c].copy() for c in self}, self.steps))
+            else:
+                state = checks.pop(0)[0]
+                for c in self:
+                    np.copyto(state[c], self[c])
+                checks.append((state, self.steps))
+        return self.steps
+
+    def compute_coarse_to_fine(
+        self,
+        n: int = 5,
+        levels: int = 2,
+        factor: int = 2,
+        coarse_steps: Optional[int] = None,
+        tol: Optional[float] = None,
+        check_every: int = 100,
+        max_period: int = 4,
+    ) -> int:
+        """Computes `n` steps warm started from coarser grids and returns
+        the number of steps computed since the initial state.
+
+        The current state is shrunk on `levels` grids `factor`, `factor`^2,
+        ... times coarser covering the same domain (`dx` and `dy` are
+        scaled accordingly). Starting from the coarsest one, each grid runs
+        `coarse_steps` steps (`n` by default), or until convergence if
+        `tol` is given (see `compute_turing`), and its state is
+        interpolated on the next finer grid. The long-wavelength structure
+        of the pattern is thus formed on small grids where the steps are
+        cheap. `self.coarse_steps` holds the number of steps computed on
+        each coarse grid (coarsest first).
+        """
+        from ._bands import make_proxy
+
+        if not all(np.issubdtype(self[c].dtype, np.floating) for c in self):
+            raise ValueError(
+                f"{self.__class__.__name__} cannot be interpolated on "
+                "coarser grids"
+            )
+        if coarse_steps is None:
+            coarse_steps = n
+        sizes = [round(self.size / factor**k) for k in range(levels, 0, -1)]
+        if levels < 0 or (sizes and sizes[0] < 3):
+            raise ValueError(
+                f"{levels} levels are too many for a grid of {self.size} "
+                f"cells ({sizes=})"
+            )
+        # Periodic axes are interpolated across the edges
+        mode = "wrap" if all(self.boundaries.wrapped(self.ndim)) else "reflect"
+        fine_shape = (self.size,) * self.ndim
+        self.coarse_steps = []
+        state = {c: self[c] for c in self}
+        for size in sizes:
+            shape = (size,) * self.ndim
+            coarse = make_proxy(self)
+            coarse.boundaries = self.boundaries
+            coarse.size = size
+            coarse.shape = self.shape[: len(self.shape) - self.ndim] + shape
+            coarse.dx = self.dx * self.size / size
+            coarse.dy = self.dy * self.size / size
+            for c in self:
+                coarse[c] = _resize(state[c], shape, mode).astype(
+                    self[c].dtype
+                )
+            coarse.set_mask(self.mask)
+            coarse.steps = 0
+            self.coarse_steps.append(
+                coarse.compute_turing(
+                    coarse_steps, tol, check_every, max_period
+                )
+            )
+            state = {c: coarse[c] for c in self}
+        if sizes:
+            # New arrays, so that the engines stepping the model notice them
+            for c in self:
+                self[c] = _resize(state[c], fine_shape, mode).astype(
+                    self[c].dtype
+                )
+                if self.masked:
+                    self[c] *= self.mask
+        return self.compute_turing(n, tol, check_every, max_period)
+
+    def record(
+        self,
+        path: str,
+        every: int = 1,
+        concentrations: Optional[List[str]] = None,
+        chunk_frames: int = 16,
+        max_queue: int = 4,
+    ):
+        """Starts recording every `every`-th step (starting with the current
+        state) of `concentrations` (all by default) into the directory
+        `path`, see `Recorder` for the format.
+
+        Returns:
+            the `Recorder`, stopped by `stop_recording`
+        """
+        from ._recorder import Recorder
+
+        self.stop_recording()
+        recorder = Recorder(
+            self, path, every, concentrations, chunk_frames, max_queue
+        )
+        recorder.record(self)
+        self._recorder = recorder
+        return recorder
+
+    def stop_recording(self) -> None:
+        """Writes the frames left and closes the current recording"""
+        recorder = self.__dict__.pop("_recorder", None)
+        if recorder is not None:
+            recorder.close()
+
+    def profile(self, memory: bool = False):
+        """Starts measuring the time spent in each phase of the computation
+        (and the memory allocated if `memory`), see `Profiler`.
+
+        Returns:
+            the `Profiler`, stopped by `stop_profiling`
+        """
+        from ._profiler import Profiler
+
+        self.stop_profiling()
+        self._profiler = Profiler(memory)
+        return self._profiler
+
+    def stop_profiling(self):
+        """Stops the current profiling and returns its `Profiler`"""
+        profiler = self.__dict__.pop("_profiler", None)
+        if profiler is not None:
+            profiler.stop()
+        return profiler
+
+    def save_checkpoint(self, path: str) -> None:
+        """Saves the complete state of the model (concentrations, initial
+        state, parameters, step count, random state...) into the file
+        `path`, to be resumed with `load_checkpoint`
+        """
+        from ._checkpoint import save_checkpoint
+
+        save_checkpoint(self, path)
+
+    @classmethod
+    def default_parameters(cls) -> Dict[str, Any]:
+        """Default value of each necessary parameter of the model"""
+        return {
+            p.name: p.dtype(p.value * p.exponent)
+            for p in cls._necessary_parameters
+        }
+
+    @classmethod
+    def load_checkpoint(cls, path: str) -> "TuringPattern":
+        """Model saved by `save_checkpoint` into the file `path`, its
+        arrays are memory-mapped (copy-on-write) from the file
+        """
+        from ._checkpoint import load_checkpoint
+
+        model = load_checkpoint(path)
+        if not isinstance(model, cls):
+            raise ValueError(
+                f"{path} holds a {type(model).__name__} model, "
+                f"not a {cls.__name__} model"
+            )
+        return model
+
+    @staticmethod
+    def normalizing_input_image(
+        A: np.ndarray,
+        size: int,
+        rng: Optional[np.random.Generator] = None,
+        ndim: int = 2,
+    ):
+        rgb = ndim == 2 and A.ndim == 3 and A.shape[-1] in (3, 4)
+        if A.ndim != ndim and not rgb:
+            print(f"Input images should be {ndim} dimensional ({A.shape=})")
             print(f"Using random distribution instead")
-            A = np.random.random((size, size))
+            if rng is None:
+                rng = np.random.default_rng()
+            A = rng.random((size,) * ndim)
         else:
-            if A.shape[-1] in (3, 4):
+            from skimage.color import rgb2gray
+
+            if rgb:
                 A = rgb2gray(A[..., :3])
-            A = resize(A, (size, size))
+            A = _resize(A, (size,) * ndim)
             max_A = np.percentile(A, 99)
             min_A = np.percentile(A, 1)
             if max_A != min_A:
@@ -155,16 +1089,105 @@ class TuringPattern:
     def init_concentrations(self, C: Optional[str] = None) -> None:
         if C is None:
             for ci in self._concentration_names:
-                self[ci] = np.random.random((self.size, self.size)) * 2 - 1
+                self[ci] = self.rng.random(self.shape) * 2 - 1
+        else:
+            self[C] = self.rng.random(self.shape) * 2 - 1
+
+    def _init_ensemble(self, ensemble_size: Optional[int]) -> Optional[int]:
+        """Finds the number of members of the ensemble from the parameters
+        given as vectors (one value per member) and reshapes these
+        parameters so they broadcast against the (N, size, size) stacks
+        ((N, size, size, size) in 3D)
+        """
+        for parameter in self._necessary_parameters:
+            value = self.__dict__.get(parameter.name)
+            if np.ndim(value) == 0:
+                continue
+            if parameter.dtype is not float:
+                raise ValueError(
+                    f"Parameter {parameter.name} cannot vary within an "
+                    "ensemble"
+                )
+            value = np.asarray(value, dtype=self.dtype).ravel()
+            if ensemble_size is None:
+                ensemble_size = len(value)
+            elif len(value) != ensemble_size:
+                raise ValueError(
+                    f"Parameter {parameter.name} has {len(value)} values "
+                    f"for an ensemble of {ensemble_size} members"
+                )
+            self[parameter.name] = value.reshape((-1,) + (1,) * self.ndim)
+        return ensemble_size
+
+    def _random_positions(self, nb_pos: int) -> Tuple[np.ndarray, ...]:
+        """Index of `nb_pos` random cells of the grid, of each member of an
+        ensemble, each member drawing its cells from its own random stream
+        """
+        if self.ensemble_size is None:
+            streams = [self.rng]
         else:
-            self[C] = np.random.random((self.size, self.size)) * 2 - 1
+            seeds = self.rng.integers(2**63, size=self.ensemble_size)
+            streams = [np.random.default_rng(seed) for seed in seeds]
+        # (ndim, nb members, nb_pos)
+        pos = np.stack(
+            [
+                (s.random((self.ndim, nb_pos)) * self.size).astype(int)
+                for s in streams
+            ],
+            axis=1,
+        )
+        if self.ensemble_size is None:
+            return tuple(pos[:, 0])
+        members = np.repeat(np.arange(self.ensemble_size), nb_pos)
+        return (members,) + tuple(pos.reshape(self.ndim, -1))
 
     def reset(self):
         for c in self.concentrations:
             self[c] = self[f"init_{c}"].copy()
+            if self.masked:
+                self[c] *= self.mask
+        self.steps = 0
+
+    def set_mask(self, mask: np.ndarray) -> None:
+        """Restricts the model to the domain of the cells where `mask` is
+        not 0 (`mask` is resized to the grid if needed, a cell being in
+        the domain if most of the area it covers is). The concentrations
+        are 0 and stay 0 outside of the domain and nothing flows through
+        its edges.
+        """
+        mask = np.asarray(mask) != 0
+        if mask.ndim != self.ndim:
+            raise ValueError(
+                f"The domain of a {self.ndim}D model is a {self.ndim}D mask "
+                f"({mask.ndim=})"
+            )
+        shape = (self.size,) * self.ndim
+        if mask.shape != shape:
+            mask = 0.5 <= _resize(mask.astype(float), shape)
+        self.mask = mask.astype(np.uint8)
+        self.masked = not self.mask.all()
+        self._nb_neighbs = None
+        if self.masked:
+            self._release_packed()
+            self._release_tiles()
+            for c in self:
+                self[c] *= self.mask
 
     def __getitem__(self, item):
-        return self.__dict__[item]
+        try:
+            return self.__dict__[item]
+        except KeyError:
+            return getattr(self, item)
+
+    def __getattr__(self, name: str):
+        # The board held by the packed Game of Life is only unpacked when
+        # it is read
+        engine = self.__dict__.get("_packed")
+        if engine is not None and name == engine.name:
+            return self.__dict__.setdefault(name, engine.board())
+        raise AttributeError(
+            f"'{self.__class__.__name__}' object has no attribute '{name}'"
+        )
 
     def __setitem__(self, item, value):
         self.__dict__[item] = value
@@ -182,19 +1205,51 @@ class TuringPattern:
         size: Optional[float] = None,
         kernel: Optional[DiffusionDirection] = None,
         boundaries: Optional[Boundaries] = None,
+        integrator: Optional[Integrator] = None,
+        tolerance: Optional[float] = None,
+        backend: Optional[Backend] = None,
+        workers: Optional[int] = None,
         concentrations: Union[
             Set[str], Tuple[str], List[str], Dict[str, np.ndarray]
         ] = ("A", "I"),
         seed: int = None,
+        ensemble_size: Optional[int] = None,
+        dtype: Optional[Union[str, type, np.dtype]] = None,
+        ndim: Optional[int] = None,
+        mask: Optional[np.ndarray] = None,
         **kwargs,
     ):
-        if seed is not None:
-            np.random.seed(seed)
+        # Each instance has its own random stream so instances can be
+        # created concurrently (the global NumPy random state is untouched)
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
         self.__dict__.update(kwargs)
+        # Precision of the (floating point) concentrations and of all the
+        # computations on them
+        self.dtype = np.dtype(
+            dtype if dtype is not None else self.default_dtype
+        )
+        if not np.issubdtype(self.dtype, np.floating):
+            raise ValueError(
+                f"The concentrations are floating point numbers ({dtype=})"
+            )
+        # 2D grids or 3D volumes of size^ndim cells
+        self.ndim = ndim if ndim is not None else self.default_ndim
+        if self.ndim not in self._ndims:
+            raise ValueError(
+                f"{self.__class__.__name__} runs in "
+                + " or ".join(f"{d}D" for d in self._ndims)
+                + f" only ({ndim=})"
+            )
         if size is not None:
             self.size = size
         else:
             self.size = self.default_size
+        self.ensemble_size = self._init_ensemble(ensemble_size)
+        if self.ensemble_size is None:
+            self.shape = (self.size,) * self.ndim
+        else:
+            self.shape = (self.ensemble_size,) + (self.size,) * self.ndim
         if dt is not None:
             self.dt = dt
         else:
@@ -205,6 +1260,11 @@ class TuringPattern:
         else:
             self.dx = dx
             self.dy = dy
+        # The backend may choose how the concentrations are stored
+        if not isinstance(backend, Backend):
+            self.backend = Backend.NumPy
+        else:
+            self.backend = backend
         if (
             isinstance(concentrations, set)
             or isinstance(concentrations, list)
@@ -227,26 +1287,95 @@ class TuringPattern:
         elif isinstance(concentrations, dict):
             for name, C in concentrations.items():
                 if C is not None:
-                    self[name] = self.normalizing_input_image(C, self.size)
+                    C = self.normalizing_input_image(
+                        C, self.size, self.rng, self.ndim
+                    )
+                    self[name] = np.broadcast_to(C, self.shape).astype(
+                        self.dtype
+                    )
                 else:
                     self.init_concentrations(name)
         else:
             self.init_concentrations()
         self.concentrations = list(concentrations)
+        for c in self.concentrations:
+            if np.issubdtype(self[c].dtype, np.floating):
+                self[c] = self[c].astype(self.dtype, copy=False)
+        # Cells of the domain (all of them by default)
+        if mask is None:
+            mask = np.ones((self.size,) * self.ndim, dtype=np.uint8)
+        self.set_mask(mask)
         for c in self.concentrations:
             self.__dict__[f"init_{c}"] = self[c].copy()
+        # Number of steps computed since the initial state
+        self.steps = 0
 
         if not isinstance(boundaries, Boundaries):
-            self.boundaries = Boundaries.Closed
+            self.boundaries = self.default_boundaries
         else:
             self.boundaries = boundaries
         if not isinstance(kernel, DiffusionDirection):
-            self.kernel = DiffusionDirection.Isotrope
+            self.kernel = self.default_kernel
         else:
             self.kernel = kernel
-        self.mask = np.ones((self.size, self.size), dtype=np.uint8)
-        self.nb_neighbs = convolve(
-            self.mask, self.kernel.value, mode="constant", cval=0
-        )
+        if not isinstance(integrator, Integrator):
+            self.integrator = Integrator.Euler
+        else:
+            self.integrator = integrator
+        # Automata (integer states) advance of one generation per step
+        if not all(np.issubdtype(self[c].dtype, np.floating) for c in self):
+            if self.dt != 1:
+                print(
+                    f"{self.__class__.__name__} advances of one generation "
+                    f"per step, using dt=1 instead of {self.dt}"
+                )
+            self.dt = 1
+            if self.integrator != Integrator.Euler:
+                print(
+                    f"{self.__class__.__name__} cannot use the "
+                    f"{self.integrator.value} integrator, "
+                    "using the Euler integrator instead"
+                )
+                self.integrator = Integrator.Euler
+        if tolerance is not None:
+            self.tolerance = tolerance
+        else:
+            self.tolerance = self.default_tolerance
+        # Number of threads of the `Threads` backend (all the cores if None)
+        self.workers = workers
+        if self.backend == Backend.Numba and not self._has_numba():
+            print("numba is not installed, using the NumPy backend instead")
+        elif self.backend == Backend.Numba and self._numba_kernel is None:
+            print(
+                f"{self.__class__.__name__} has no compiled step, "
+                "using the NumPy backend instead"
+            )
+        elif (
+            self.backend in (Backend.Packed, Backend.HashLife)
+            and not self._life_like
+        ):
+            print(
+                f"{self.__class__.__name__} cannot use the "
+                f"{self.backend.value} backend, using the NumPy backend "
+                "instead"
+            )
+        elif self.backend == Backend.Tiles and self.ensemble_size is not None:
+            print(
+                "The Tiles backend does not step ensembles, "
+                "using the NumPy backend instead"
+            )
+        elif (
+            self.backend in (Backend.Numba, Backend.Threads, Backend.Tiles)
+            and self.ndim != 2
+        ):
+            print(
+                f"The {self.backend.value} backend runs in 2D only, "
+                "using the NumPy backend instead"
+            )
+        elif self.backend == Backend.HashLife:
+            print(
+                "The HashLife backend runs on an unbounded plane, "
+                "the boundaries are ignored"
+            )
 
         self._has_necessary_attr()
@@ -0,0 +1,174 @@
+import copy
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+
+from ._TuringPattern import Boundaries
+
+_pools: Dict[int, ThreadPoolExecutor] = {}
+
+
+# Attributes that belong to a proxy (a band or a set of tiles) and are
+# not copied from the model
+_proxy_attributes = {
+    "_work",
+    "_numba_back",
+    "_adaptive_work",
+    "_spectral_cache",
+    "_bands",
+    "_tiles",
+    "_crop",
+    "_domain_route",
+    "_recorder",
+    "_profiler",
+    "_packed",
+    "_hashlife",
+    "_rule_index",
+    "_boundaries",
+    "_nb_neighbs",
+    "mask",
+    "masked",
+}
+
+
+def make_proxy(model):
+    """Shallow copy of `model` sharing its parameters but none of its
+    work buffers, engines, boundaries and mask
+    """
+    proxy = copy.copy(model)
+    proxy.__dict__ = {
+        k: v for k, v in model.__dict__.items() if k not in _proxy_attributes
+    }
+    return proxy
+
+
+def copy_parameters(model, proxy) -> None:
+    """Copies the (possibly modified) parameters of `model` into `proxy`"""
+    for k, v in model.__dict__.items():
+        if k not in _proxy_attributes and k not in model.concentrations:
+            proxy.__dict__[k] = v
+
+
+def _pool(workers: int) -> ThreadPoolExecutor:
+    if workers not in _pools:
+        _pools[workers] = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="napari-turing"
+        )
+    return _pools[workers]
+
+
+class RowBands:
+    """Decomposition of a model into bands of rows stepped in parallel.
+
+    Each band holds its own copy of its rows plus one halo row above and
+    below (for every concentration and for the mask). While
+    `run` is stepping, the bands are the reference state and only the halo
+    rows are exchanged between two steps. The bands are computed by
+    shallow copies of the model whose rows are closed (the halo rows carry
+    the neighbouring values) so the model equations are used unchanged.
+    NumPy and SciPy release the GIL for the heavy work, so the bands run
+    concurrently.
+    """
+
+    def __init__(self, model, workers: int = None):
+        self.model = model
+        self.workers = workers or os.cpu_count() or 1
+        nb_rows = model[model.concentrations[0]].shape[-2]
+        self.nb_bands = max(1, min(self.workers, nb_rows))
+        self.edges = np.linspace(0, nb_rows, self.nb_bands + 1).astype(int)
+        self.boundaries = model.boundaries
+        self.kernel = model.kernel
+        self.mask = model.mask
+        self.shape = model[model.concentrations[0]].shape
+        self.proxies: List = []
+        for start, end in zip(self.edges[:-1], self.edges[1:]):
+            proxy = make_proxy(model)
+            # The rows are closed for a band, its halo rows hold the values
+            # of the neighbouring rows (or zeros on a closed edge)
+            if model.boundaries.wrapped_axes[1]:
+                proxy.boundaries = Boundaries.Left_Right_Tube
+            else:
+                proxy.boundaries = Boundaries.Closed
+            proxy.kernel = model.kernel
+            for c in model:
+                proxy[c] = np.zeros(
+                    self.shape[:-2] + (end - start + 2, self.shape[-1]),
+                    dtype=model[c].dtype,
+                )
+            proxy.mask = np.zeros(
+                (end - start + 2, model.mask.shape[-1]),
+                dtype=model.mask.dtype,
+            )
+            proxy.mask[1:-1] = model.mask[start:end]
+            proxy.masked = model.masked
+            self.proxies.append(proxy)
+        for b in range(self.nb_bands):
+            self._exchange_halos(b, ["mask"])
+
+    def matches(self, model, workers: int = None) -> bool:
+        return (
+            self.model is model
+            and self.workers == (workers or os.cpu_count() or 1)
+            and self.boundaries == model.boundaries
+            and self.kernel == model.kernel
+            and self.mask is model.mask
+            and self.shape == model[model.concentrations[0]].shape
+        )
+
+    def _exchange_halos(self, b: int, names: List[str]) -> None:
+        """Copies the first and last rows of the neighbouring bands
+        into the halo rows of the band `b`
+        """
+        wrap_rows = self.boundaries.wrapped_axes[0]
+        last = self.nb_bands - 1
+        proxy = self.proxies[b]
+        above = b - 1 if 0 < b else (last if wrap_rows else None)
+        below = b + 1 if b < last else (0 if wrap_rows else None)
+        for name in names:
+            if above is None:
+                proxy[name][..., 0, :] = 0
+            else:
+                proxy[name][..., 0, :] = self.proxies[above][name][..., -2, :]
+            if below is None:
+                proxy[name][..., -1, :] = 0
+            else:
+                proxy[name][..., -1, :] = self.proxies[below][name][..., 1, :]
+
+    def scatter(self) -> None:
+        """Copies the model concentrations and parameters into the bands"""
+        for proxy, start, end in zip(self.proxies, self.edges, self.edges[1:]):
+            copy_parameters(self.model, proxy)
+            for c in self.model:
+                proxy[c][..., 1:-1, :] = self.model[c][..., start:end, :]
+
+    def gather(self) -> None:
+        """Copies the concentrations of the bands back into the model"""
+        for proxy, start, end in zip(self.proxies, self.edges, self.edges[1:]):
+            for c in self.model:
+                self.model[c][..., start:end, :] = proxy[c][..., 1:-1, :]
+
+    def _step_band(self, b: int) -> None:
+        proxy = self.proxies[b]
+        derivatives = proxy._derivatives()
+        for c in proxy:
+            derivatives[c] *= proxy.dt
+            proxy[c] += derivatives[c]
+
+    def run(self, n: int) -> None:
+        pool = _pool(self.nb_bands)
+        concentrations = list(self.model.concentrations)
+        profiler = self.model.__dict__.get("_profiler")
+        self.scatter()
+        for _ in range(n):
+            start = time.perf_counter()
+            for b in range(self.nb_bands):
+                self._exchange_halos(b, concentrations)
+            halos = time.perf_counter()
+            list(pool.map(self._step_band, range(self.nb_bands)))
+            if profiler is not None:
+                profiler.add("halo exchange", halos - start)
+                profiler.add("bands", time.perf_counter() - halos)
+        self.gather()
@@ -0,0 +1,164 @@
+import json
+import struct
+from enum import Enum
+from importlib import import_module
+from typing import Any, Dict
+
+import numpy as np
+
+from ._TuringPattern import (
+    Backend,
+    Boundaries,
+    DiffusionDirection,
+    Integrator,
+)
+
+# A checkpoint file is the magic string, the length of the header, the
+# header (JSON) and the raw arrays, each one aligned on `_ALIGNMENT` bytes
+# so it can be memory-mapped
+_MAGIC = b"\x93NTURING"
+_VERSION = 1
+_ALIGNMENT = 64
+_ENUMS = {
+    e.__name__: e
+    for e in (Backend, Boundaries, DiffusionDirection, Integrator)
+}
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _encode(name: str, value: Any) -> Any:
+    """JSON representation of the attribute `name` of a model"""
+    if isinstance(value, Enum) and type(value).__name__ in _ENUMS:
+        return {"enum": type(value).__name__, "name": value.name}
+    if isinstance(value, tuple):
+        return {"tuple": [_encode(name, v) for v in value]}
+    if isinstance(value, list):
+        return [_encode(name, v) for v in value]
+    if isinstance(value, dict):
+        return {"dict": {k: _encode(name, v) for k, v in value.items()}}
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise ValueError(
+        f"The attribute {name} ({type(value).__name__}) cannot be saved"
+    )
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if isinstance(value, dict):
+        if "enum" in value:
+            return _ENUMS[value["enum"]][value["name"]]
+        if "tuple" in value:
+            return tuple(_decode(v) for v in value["tuple"])
+        return {k: _decode(v) for k, v in value["dict"].items()}
+    return value
+
+
+def save_checkpoint(model, path: str) -> None:
+    """Writes the complete state of `model` into the file `path`"""
+    attributes: Dict[str, Any] = {}
+    arrays: Dict[str, np.ndarray] = {}
+    # The concentrations are read from the model (an engine may hold them)
+    state = {**model.__dict__, **{c: model[c] for c in model}}
+    for name, value in state.items():
+        if name.startswith("_"):
+            # Work buffers and engines are rebuilt when needed
+            continue
+        if isinstance(value, np.ndarray):
+            arrays[name] = np.ascontiguousarray(value)
+        elif isinstance(value, np.random.Generator):
+            attributes[name] = {
+                "rng": value.bit_generator.state["bit_generator"],
+                "state": value.bit_generator.state,
+            }
+        elif isinstance(value, np.dtype):
+            attributes[name] = {"dtype": value.str}
+        else:
+            attributes[name] = _encode(name, value)
+    header = {
+        "version": _VERSION,
+        "module": type(model).__module__,
+        "model": type(model).__name__,
+        "boundaries": model.boundaries.name,
+        "kernel": model.kernel.name,
+        "attributes": attributes,
+    }
+    offsets = {}
+    offset = 0
+    for name, array in arrays.items():
+        offsets[name] = offset
+        offset = _aligned(offset + array.nbytes)
+    # The arrays start after the header, whose length depends on their
+    # offsets
+    start = 0
+    while True:
+        header["arrays"] = {
+            name: {
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+                "offset": start + offsets[name],
+            }
+            for name, array in arrays.items()
+        }
+        encoded = json.dumps(header).encode()
+        end_of_header = _aligned(len(_MAGIC) + 8 + len(encoded))
+        if end_of_header <= start:
+            break
+        start = end_of_header
+    with open(path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(struct.pack("<Q", len(encoded)))
+        f.write(encoded)
+        for name, array in arrays.items():
+            f.seek(header["arrays"][name]["offset"])
+            array.tofile(f)
+
+
+def load_checkpoint(path: str):
+    """Model saved in the file `path`, its arrays are mapped copy-on-write
+    from the file (modifying them leaves the file unchanged)
+    """
+    with open(path, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"{path} is not a checkpoint of a model")
+        (length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length))
+    if _VERSION < header["version"]:
+        raise ValueError(
+            f"{path} was written by a more recent version of napari-turing"
+        )
+    cls = getattr(import_module(header["module"]), header["model"])
+    model = cls.__new__(cls)
+    for name, value in header["attributes"].items():
+        if isinstance(value, dict) and "rng" in value:
+            bit_generator = getattr(np.random, value["rng"])()
+            bit_generator.state = value["state"]
+            value = np.random.Generator(bit_generator)
+        elif isinstance(value, dict) and "dtype" in value:
+            value = np.dtype(value["dtype"])
+        else:
+            value = _decode(value)
+        model.__dict__[name] = value
+    for name, description in header["arrays"].items():
+        dtype = np.dtype(description["dtype"])
+        shape = tuple(description["shape"])
+        if 0 in shape:
+            array = np.empty(shape, dtype=dtype)
+        else:
+            array = np.memmap(
+                path,
+                mode="c",
+                dtype=dtype,
+                shape=shape,
+                offset=description["offset"],
+            )
+        model.__dict__[name] = array
+    model.boundaries = Boundaries[header["boundaries"]]
+    model.kernel = DiffusionDirection[header["kernel"]]
+    return model
@@ -0,0 +1,342 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class Node:
+    """Square of 2^level x 2^level cells of the plane made of four
+    quadrants of level - 1. The nodes are canonical (two nodes with the
+    same content are the same object), so their results can be memoized.
+    """
+
+    __slots__ = ("level", "nw", "ne", "sw", "se", "population", "next")
+
+    def __init__(self, level, nw, ne, sw, se, population) -> None:
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.population = population
+        # Memoized centres of level - 1 advanced 2^j generations, by j
+        self.next: Dict[int, "Node"] = {}
+
+
+def _life_table() -> np.ndarray:
+    """Next state of the 2x2 centre of every 4x4 block, the cell (r, c)
+    of the block being the bit 4 * r + c of the index and the cell (r, c)
+    of the centre the bit 2 * (r - 1) + (c - 1) of the result
+    """
+    codes = np.arange(2**16)
+    cells = (codes[:, None] >> np.arange(16)) & 1
+    cells = cells.reshape(-1, 4, 4)
+    table = np.zeros(2**16, dtype=np.uint8)
+    for bit, (r, c) in enumerate([(1, 1), (1, 2), (2, 1), (2, 2)]):
+        alive = cells[:, r - 1 : r + 2, c - 1 : c + 2].sum(axis=(1, 2))
+        alive -= cells[:, r, c]
+        new = (alive == 3) | ((alive == 2) & (cells[:, r, c] == 1))
+        table |= new.astype(np.uint8) << bit
+    return table
+
+
+class HashLife:
+    """Game of Life on the unbounded plane with the HashLife algorithm.
+
+    The plane is a canonical quadtree (one per member of an ensemble)
+    whose nodes memoize their future, so that regular patterns advance
+    2^k generations at the cost of a few node lookups. `run(n)` jumps
+    the generations given by the binary decomposition of `n`. The model
+    board is the window [0, H) x [0, W) of the plane: it is imported when
+    it was modified outside of the engine and rendered after each run.
+
+    The nodes are kept in a table of at most `max_nodes` nodes (checked
+    before each jump), when it is full the memoized results are dropped
+    and only the nodes of the current patterns are kept.
+    """
+
+    _table_4x4 = None
+
+    def __init__(self, model, max_nodes: int = 2**20) -> None:
+        self.model = model
+        self.name = model.concentrations[0]
+        self.shape = model[self.name].shape
+        self.max_nodes = max_nodes
+        if HashLife._table_4x4 is None:
+            HashLife._table_4x4 = _life_table()
+        self._off = Node(0, None, None, None, None, 0)
+        self._on = Node(0, None, None, None, None, 1)
+        self._reset_cache()
+        self.roots: List[Node] = []
+        # Plane coordinates of the top left cell of each root
+        self.origins: List[Tuple[int, int]] = []
+        self._rendered: Optional[np.ndarray] = None
+
+    def matches(self, model) -> bool:
+        return self.model is model and self.shape == model[self.name].shape
+
+    def _reset_cache(self) -> None:
+        self._nodes: Dict[Tuple[Node, Node, Node, Node], Node] = {}
+        self._empty: List[Node] = [self._off]
+        self._blocks: Dict[int, Node] = {}
+        self._arrays: Dict[Node, np.ndarray] = {}
+
+    # Construction of the nodes
+    # -------------------------
+    def join(self, nw: Node, ne: Node, sw: Node, se: Node) -> Node:
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            population = (
+                nw.population + ne.population + sw.population + se.population
+            )
+            node = Node(nw.level + 1, nw, ne, sw, se, population)
+            self._nodes[key] = node
+        return node
+
+    def empty(self, level: int) -> Node:
+        while len(self._empty) <= level:
+            e = self._empty[-1]
+            self._empty.append(self.join(e, e, e, e))
+        return self._empty[level]
+
+    def _expand(self, node: Node) -> Node:
+        """Node of level + 1 with `node` at its centre"""
+        e = self.empty(node.level - 1)
+        return self.join(
+            self.join(e, e, e, node.nw),
+            self.join(e, e, node.ne, e),
+            self.join(e, node.sw, e, e),
+            self.join(node.se, e, e, e),
+        )
+
+    def _centre(self, node: Node) -> Node:
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def _centre_horizontal(self, w: Node, e: Node) -> Node:
+        return self.join(w.ne, e.nw, w.se, e.sw)
+
+    def _centre_vertical(self, n: Node, s: Node) -> Node:
+        return self.join(n.sw, n.se, s.nw, s.ne)
+
+    # Evolution
+    # ---------
+    def _life_4x4(self, node: Node) -> Node:
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        cells = [
+            nw.nw, nw.ne, ne.nw, ne.ne,
+            nw.sw, nw.se, ne.sw, ne.se,
+            sw.nw, sw.ne, se.nw, se.ne,
+            sw.sw, sw.se, se.sw, se.se,
+        ]  # fmt: skip
+        code = 0
+        for bit, cell in enumerate(cells):
+            code |= cell.population << bit
+        result = int(self._table_4x4[code])
+        leaves = [self._on if result >> b & 1 else self._off for b in range(4)]
+        return self.join(*leaves)
+
+    def successor(self, node: Node, j: int) -> Node:
+        """Centre (of level - 1) of `node` advanced 2^j generations,
+        j <= level - 2
+        """
+        if node.population == 0:
+            return self.empty(node.level - 1)
+        result = node.next.get(j)
+        if result is not None:
+            return result
+        if node.level == 2:
+            result = self._life_4x4(node)
+        else:
+            # The nine overlapping sub-squares of level - 1
+            n00 = node.nw
+            n01 = self._centre_horizontal(node.nw, node.ne)
+            n02 = node.ne
+            n10 = self._centre_vertical(node.nw, node.sw)
+            n11 = self._centre(node)
+            n12 = self._centre_vertical(node.ne, node.se)
+            n20 = node.sw
+            n21 = self._centre_horizontal(node.sw, node.se)
+            n22 = node.se
+            squares = [n00, n01, n02, n10, n11, n12, n20, n21, n22]
+            if j == node.level - 2:
+                # Two rounds of 2^(level - 3) generations
+                a = [self.successor(s, j - 1) for s in squares]
+                j_second = j - 1
+            else:
+                # The first round only takes the centres
+                a = [self._centre(s) for s in squares]
+                j_second = j
+            result = self.join(
+                self.successor(self.join(a[0], a[1], a[3], a[4]), j_second),
+                self.successor(self.join(a[1], a[2], a[4], a[5]), j_second),
+                self.successor(self.join(a[3], a[4], a[6], a[7]), j_second),
+                self.successor(self.join(a[4], a[5], a[7], a[8]), j_second),
+            )
+        node.next[j] = result
+        return result
+
+    def _jump(self, member: int, j: int) -> None:
+        """Advances the member `member` of 2^j generations"""
+        root = self.roots[member]
+        top, left = self.origins[member]
+        # The living cells can move of 2^j cells, they have to stay in
+        # the centre of the result
+        while (
+            root.level < j + 3
+            or root.population != self._centre(self._centre(root)).population
+        ):
+            top -= 2 ** (root.level - 1)
+            left -= 2 ** (root.level - 1)
+            root = self._expand(root)
+        offset = 2 ** (root.level - 2)
+        self.roots[member] = self.successor(root, j)
+        self.origins[member] = (top + offset, left + offset)
+
+    def _collect(self) -> None:
+        """Drops the memoized results and the nodes that are not part
+        of the current patterns
+        """
+        roots = self.roots
+        self._reset_cache()
+        stack = list(roots)
+        seen = set()
+        while stack:
+            node = stack.pop()
+            if node.level == 0 or node in seen:
+                continue
+            seen.add(node)
+            node.next = {}
+            self._nodes[(node.nw, node.ne, node.sw, node.se)] = node
+            stack.extend((node.nw, node.ne, node.sw, node.se))
+
+    # Conversion from and to arrays
+    # -----------------------------
+    def _block(self, code: int) -> Node:
+        """Level 3 node of the 8x8 block whose cell (r, c) is the bit
+        8 * r + c of `code`
+        """
+        node = self._blocks.get(code)
+        if node is None:
+            grid = [
+                [
+                    self._on if code >> (8 * r + c) & 1 else self._off
+                    for c in range(8)
+                ]
+                for r in range(8)
+            ]
+            while len(grid) > 1:
+                grid = [
+                    [
+                        self.join(
+                            grid[r][c],
+                            grid[r][c + 1],
+                            grid[r + 1][c],
+                            grid[r + 1][c + 1],
+                        )
+                        for c in range(0, len(grid), 2)
+                    ]
+                    for r in range(0, len(grid), 2)
+                ]
+            node = grid[0][0]
+            self._blocks[code] = node
+        return node
+
+    def from_array(self, board: np.ndarray) -> Node:
+        top_level = max(3, int(np.ceil(np.log2(max(board.shape)))))
+        size = 2**top_level
+        padded = np.zeros((size, size), dtype=np.uint8)
+        padded[: board.shape[0], : board.shape[1]] = board != 0
+        nb = size // 8
+        blocks = padded.reshape(nb, 8, nb, 8).transpose(0, 2, 1, 3)
+        codes = np.packbits(
+            blocks.reshape(nb, nb, 64), axis=-1, bitorder="little"
+        ).view("<u8")[..., 0]
+        # Only the non-empty squares are built, level by level
+        squares = {
+            (r, c): self._block(int(codes[r, c]))
+            for r, c in zip(*np.nonzero(codes))
+        }
+        for level in range(3, top_level):
+            e = self.empty(level)
+            parents = {(r // 2, c // 2) for r, c in squares}
+            squares = {
+                (r, c): self.join(
+                    squares.get((2 * r, 2 * c), e),
+                    squares.get((2 * r, 2 * c + 1), e),
+                    squares.get((2 * r + 1, 2 * c), e),
+                    squares.get((2 * r + 1, 2 * c + 1), e),
+                )
+                for r, c in parents
+            }
+        return squares.get((0, 0), self.empty(top_level))
+
+    def _array(self, node: Node) -> np.ndarray:
+        """Cells of a node of level 3 or less"""
+        array = self._arrays.get(node)
+        if array is None:
+            if node.level == 0:
+                array = np.full((1, 1), node.population, dtype=np.uint8)
+            else:
+                array = np.block(
+                    [
+                        [self._array(node.nw), self._array(node.ne)],
+                        [self._array(node.sw), self._array(node.se)],
+                    ]
+                )
+            self._arrays[node] = array
+        return array
+
+    def _render(
+        self, node: Node, top: int, left: int, out: np.ndarray
+    ) -> None:
+        """Writes the cells of `node` (whose top left cell is at (top,
+        left)) that are in the window [0, H) x [0, W) into `out`
+        """
+        size = 2**node.level
+        H, W = out.shape
+        if (
+            node.population == 0
+            or H <= top
+            or W <= left
+            or top + size <= 0
+            or left + size <= 0
+        ):
+            return
+        if node.level <= 3:
+            array = self._array(node)
+            r0, c0 = max(top, 0), max(left, 0)
+            r1, c1 = min(top + size, H), min(left + size, W)
+            out[r0:r1, c0:c1] = array[
+                r0 - top : r1 - top, c0 - left : c1 - left
+            ]
+            return
+        half = size // 2
+        self._render(node.nw, top, left, out)
+        self._render(node.ne, top, left + half, out)
+        self._render(node.sw, top + half, left, out)
+        self._render(node.se, top + half, left + half, out)
+
+    def run(self, n: int) -> None:
+        board = self.model[self.name]
+        # The members of an ensemble are stacked along the first axis
+        members = (
+            [()] if board.ndim == 2 else [(m,) for m in range(len(board))]
+        )
+        if self._rendered is None or not np.array_equal(board, self._rendered):
+            # The board was modified outside of the engine
+            self.roots = [self.from_array(board[m]) for m in members]
+            self.origins = [(0, 0)] * len(members)
+        j = 0
+        while n >> j:
+            if n >> j & 1:
+                if self.max_nodes < len(self._nodes):
+                    self._collect()
+                for m in range(len(members)):
+                    self._jump(m, j)
+            j += 1
+        window = np.zeros(board.shape[-2:], dtype=np.uint8)
+        for m, root, (top, left) in zip(members, self.roots, self.origins):
+            window[...] = 0
+            self._render(root, top, left, window)
+            board[m] = window
+        self._rendered = board.copy()
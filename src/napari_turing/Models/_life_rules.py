@@ -0,0 +1,70 @@
+import re
+from typing import FrozenSet, Sequence, Tuple, Union
+
+import numpy as np
+
+Rule = Tuple[FrozenSet[int], FrozenSet[int], int]
+
+CONWAY: Rule = (frozenset({3}), frozenset({2, 3}), 2)
+
+
+def parse_rule(rule: str) -> Rule:
+    """Birth and survival neighbour counts and number of states of a
+    Life-like rule.
+
+    The rules are given in B/S notation ("B3/S23", "B36/S23"), possibly
+    with a number of states for Generations rules ("B2/S/C3", or "B2/S/3"),
+    or in the S/B notation ("23/3", "/2/3").
+
+    Generations rules have `states` - 2 dying states: a live cell (1)
+    that does not survive becomes 2, then 3, ... and dead (0) after
+    `states` - 1. Only the live cells are counted as neighbours and only
+    dead cells can be born.
+    """
+    parts = rule.strip().upper().split("/")
+    if not 2 <= len(parts) <= 3:
+        raise ValueError(f"Invalid rule {rule!r}, expected e.g. 'B3/S23'")
+    counts = {}
+    states = 2
+    for i, part in enumerate(parts):
+        match = re.fullmatch(r"([BSCG]?)(\d*)", part)
+        if match is None:
+            raise ValueError(f"Invalid rule {rule!r} ({part!r})")
+        prefix, digits = match.groups()
+        if not prefix:
+            # S/B/C notation
+            prefix = "SBC"[i]
+        if prefix in "CG":
+            if not digits or int(digits) < 2:
+                raise ValueError(f"Invalid number of states in {rule!r}")
+            states = int(digits)
+        elif prefix in counts or any(d == "9" for d in digits):
+            raise ValueError(f"Invalid rule {rule!r} ({part!r})")
+        else:
+            counts[prefix] = frozenset(int(d) for d in digits)
+    if set(counts) != {"B", "S"}:
+        raise ValueError(f"Invalid rule {rule!r}, expected e.g. 'B3/S23'")
+    return counts["B"], counts["S"], states
+
+
+def rule_table(rules: Union[str, Sequence[str]]) -> Tuple[np.ndarray, int]:
+    """Lookup table of the next state of a cell, indexed by
+    (nb live neighbours) * nb states + state (one table after the other
+    for a sequence of rules), and the largest number of states
+    """
+    if isinstance(rules, str):
+        rules = [rules]
+    parsed = [parse_rule(rule) for rule in rules]
+    states = max(p[2] for p in parsed)
+    table = np.zeros((len(parsed), 9, states), dtype=np.int64)
+    for t, (birth, survival, nb_states) in zip(table, parsed):
+        for count in range(9):
+            t[count, 0] = 1 if count in birth else 0
+            if count in survival:
+                t[count, 1] = 1
+            else:
+                t[count, 1] = 2 % nb_states
+            # The dying cells age whatever their neighbours
+            for state in range(2, nb_states):
+                t[count, state] = (state + 1) % nb_states
+    return table.ravel(), states
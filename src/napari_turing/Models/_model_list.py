@@ -1,12 +1,28 @@
 from enum import Enum
-from .FitzHughNagumo import FitzHughNagumo
-from .Brusselator import Brusselator
-from .GrayScott import GrayScott
-from .GameOfLife import GameOfLife
+from importlib import import_module
+from typing import Type
+
+__all__ = ["AvailableModels"]
 
 
 class AvailableModels(Enum):
-    FitzHughNagumo = FitzHughNagumo
-    Brusselator = Brusselator
-    GrayScott = GrayScott
-    GameOfLife = GameOfLife
+    """The models shown in napari, each one given by the module
+    (relative to `napari_turing.Models`) defining the class of the same
+    name. The module is only imported when the model class is needed,
+    through `AvailableModels.<name>.value`.
+    """
+
+    FitzHughNagumo = ".FitzHughNagumo"
+    Brusselator = ".Brusselator"
+    GrayScott = ".GrayScott"
+    GameOfLife = ".GameOfLife"
+
+    @property
+    def value(self) -> Type:
+        return getattr(import_module(self._value_, __package__), self.name)
+
+
+def __getattr__(name):
+    if name in AvailableModels.__members__:
+        return AvailableModels[name].value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
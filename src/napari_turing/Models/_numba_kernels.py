@@ -0,0 +1,195 @@
+"""Compiled steps of the built-in models (optional, requires numba)
+
+Each function fuses the reaction, the 5-point diffusion and the Euler
+update of all the concentrations of a model into a single loop over the
+grid. The new concentrations are written into the `out_*` arrays.
+
+The diffusion weights are given as (below, above, right, left) which
+correspond to the kernel entries [0, 1], [2, 1], [1, 0] and [1, 2] of a
+`DiffusionDirection` (these kernels are convolved, hence flipped).
+"""
+
+try:
+    from numba import njit, prange
+
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def decorator(function):
+            return function
+
+        return decorator
+
+    prange = range
+
+
+@njit(inline="always")
+def _neighbour_sum(arr, i, j, weights, wrap_rows, wrap_columns):
+    nb_rows, nb_columns = arr.shape
+    # Accumulated in the precision of the concentrations
+    total = arr.dtype.type(0)
+    if i + 1 < nb_rows:
+        total += weights[0] * arr[i + 1, j]
+    elif wrap_rows:
+        total += weights[0] * arr[0, j]
+    if 0 < i:
+        total += weights[1] * arr[i - 1, j]
+    elif wrap_rows:
+        total += weights[1] * arr[nb_rows - 1, j]
+    if j + 1 < nb_columns:
+        total += weights[2] * arr[i, j + 1]
+    elif wrap_columns:
+        total += weights[2] * arr[i, 0]
+    if 0 < j:
+        total += weights[3] * arr[i, j - 1]
+    elif wrap_columns:
+        total += weights[3] * arr[i, nb_columns - 1]
+    return total
+
+
+@njit(inline="always")
+def _laplacian(arr, i, j, nb_neighbs, weights, wrap_rows, wrap_columns):
+    return (
+        _neighbour_sum(arr, i, j, weights, wrap_rows, wrap_columns)
+        - nb_neighbs[i, j] * arr[i, j]
+    )
+
+
+@njit(parallel=True, cache=True)
+def fitzhugh_nagumo(
+    A,
+    I,
+    out_A,
+    out_I,
+    nb_neighbs,
+    weights,
+    wrap_rows,
+    wrap_columns,
+    dt,
+    dxdy,
+    mu_a,
+    mu_i,
+    tau,
+    k,
+):
+    nb_rows, nb_columns = A.shape
+    for i in prange(nb_rows):
+        for j in range(nb_columns):
+            a = A[i, j]
+            inhibitor = I[i, j]
+            lap_a = _laplacian(
+                A, i, j, nb_neighbs, weights, wrap_rows, wrap_columns
+            )
+            lap_i = _laplacian(
+                I, i, j, nb_neighbs, weights, wrap_rows, wrap_columns
+            )
+            out_A[i, j] = a + dt * (
+                a - a * a * a - inhibitor + k + mu_a * lap_a / dxdy
+            )
+            out_I[i, j] = inhibitor + dt * (
+                (a - inhibitor + mu_i * lap_i / dxdy) / tau
+            )
+
+
+@njit(parallel=True, cache=True)
+def brusselator(
+    X,
+    Y,
+    out_X,
+    out_Y,
+    nb_neighbs,
+    weights,
+    wrap_rows,
+    wrap_columns,
+    dt,
+    dxdy,
+    A,
+    B,
+    mu_x,
+    mu_y,
+):
+    nb_rows, nb_columns = X.shape
+    for i in prange(nb_rows):
+        for j in range(nb_columns):
+            x = X[i, j]
+            y = Y[i, j]
+            x2y = x * x * y
+            lap_x = _laplacian(
+                X, i, j, nb_neighbs, weights, wrap_rows, wrap_columns
+            )
+            lap_y = _laplacian(
+                Y, i, j, nb_neighbs, weights, wrap_rows, wrap_columns
+            )
+            out_X[i, j] = x + dt * (A + x2y - B * x - x + mu_x * lap_x / dxdy)
+            out_Y[i, j] = y + dt * (B * x - x2y + mu_y * lap_y / dxdy)
+
+
+@njit(parallel=True, cache=True)
+def gray_scott(
+    X,
+    Y,
+    out_X,
+    out_Y,
+    nb_neighbs,
+    weights,
+    wrap_rows,
+    wrap_columns,
+    dt,
+    dxdy,
+    k,
+    F,
+    mu_x,
+    mu_y,
+):
+    nb_rows, nb_columns = X.shape
+    for i in prange(nb_rows):
+        for j in range(nb_columns):
+            x = X[i, j]
+            y = Y[i, j]
+            xy2 = x * y * y
+            lap_x = _laplacian(
+                X, i, j, nb_neighbs, weights, wrap_rows, wrap_columns
+            )
+            lap_y = _laplacian(
+                Y, i, j, nb_neighbs, weights, wrap_rows, wrap_columns
+            )
+            out_X[i, j] = x + dt * (-xy2 + F * (1 - x) + mu_x * lap_x / dxdy)
+            out_Y[i, j] = y + dt * (xy2 - (F + k) * y + mu_y * lap_y / dxdy)
+
+
+@njit(parallel=True, cache=True)
+def game_of_life(
+    board,
+    out_board,
+    nb_neighbs,
+    weights,
+    wrap_rows,
+    wrap_columns,
+    dt,
+    dxdy,
+):
+    nb_rows, nb_columns = board.shape
+    for i in prange(nb_rows):
+        for j in range(nb_columns):
+            alive = 0
+            for di in range(-1, 2):
+                row = i + di
+                if row < 0 or nb_rows <= row:
+                    if not wrap_rows:
+                        continue
+                    row %= nb_rows
+                for dj in range(-1, 2):
+                    if di == 0 and dj == 0:
+                        continue
+                    column = j + dj
+                    if column < 0 or nb_columns <= column:
+                        if not wrap_columns:
+                            continue
+                        column %= nb_columns
+                    alive += board[row, column]
+            if alive == 3 or (alive == 2 and board[i, j]):
+                out_board[i, j] = 1
+            else:
+                out_board[i, j] = 0
@@ -0,0 +1,166 @@
+from typing import Optional
+
+import numpy as np
+
+
+def pack(board: np.ndarray) -> np.ndarray:
+    """Packs the cells of a (..., H, W) board into (..., H, ceil(W / 64))
+    64 bit words, the column 64 * k + j being the bit j of the word k
+    (the padding bits of the last word are 0)
+    """
+    nb_words = -(-board.shape[-1] // 64)
+    packed = np.packbits(board != 0, axis=-1, bitorder="little")
+    words = np.zeros(board.shape[:-1] + (nb_words * 8,), dtype=np.uint8)
+    words[..., : packed.shape[-1]] = packed
+    return words.view("<u8").astype(np.uint64, copy=False)
+
+
+def unpack(words: np.ndarray, nb_columns: int) -> np.ndarray:
+    """(..., H, W) uint8 board (0 or 1) of packed `words`"""
+    return np.unpackbits(
+        words.astype("<u8", copy=False).view(np.uint8),
+        axis=-1,
+        count=nb_columns,
+        bitorder="little",
+    )
+
+
+class PackedLife:
+    """Game of Life on a board packed into 64 bit words, 64 cells being
+    updated by each bitwise operation.
+
+    The number of live neighbours is never computed: the three cells of
+    each row are summed with full adders (two bits per cell), the three
+    rows are then summed and only the bits telling whether this sum is 2
+    or 3 are kept.
+
+    The words are the state of the board: once stepped, the board of the
+    model is only unpacked (into a read-only uint8 array) when it is read,
+    and the words are packed again when a new board is given to the model.
+    """
+
+    def __init__(self, model) -> None:
+        self.model = model
+        self.name = model.concentrations[0]
+        board = model[self.name]
+        self.shape = board.shape
+        self.dtype = board.dtype
+        self.boundaries = model.boundaries
+        self.wrap_rows, self.wrap_columns = model.boundaries.wrapped_axes
+        nb_columns = self.shape[-1]
+        nb_words = -(-nb_columns // 64)
+        words_shape = self.shape[:-1] + (nb_words,)
+        self.words = np.zeros(words_shape, dtype=np.uint64)
+        # Unpacked board handed to the model (None if not read since the
+        # last step)
+        self._board: Optional[np.ndarray] = None
+        self._buffers = [
+            np.empty(words_shape, dtype=np.uint64) for _ in range(8)
+        ]
+        # Bit of the last column in the last word and mask of the columns
+        self._last_bit = np.uint64((nb_columns - 1) % 64)
+        self._last_mask = np.uint64(2 ** ((nb_columns - 1) % 64 + 1) - 1)
+
+    def matches(self, model) -> bool:
+        # The board is not in the model while the words hold it
+        board = model.__dict__.get(self.name)
+        return (
+            self.model is model
+            and self.boundaries == model.boundaries
+            and (board is None or self.shape == board.shape)
+        )
+
+    def _shift_columns(
+        self, x: np.ndarray, west: np.ndarray, east: np.ndarray, tmp
+    ) -> None:
+        """`west` (`east`) holds for each cell its neighbour on the left
+        (right)
+        """
+        one, last = np.uint64(1), np.uint64(63)
+        np.left_shift(x, one, out=west)
+        np.right_shift(x[..., :-1], last, out=tmp[..., :-1])
+        west[..., 1:] |= tmp[..., :-1]
+        np.right_shift(x, one, out=east)
+        np.left_shift(x[..., 1:], last, out=tmp[..., 1:])
+        east[..., :-1] |= tmp[..., 1:]
+        if self.wrap_columns:
+            west[..., 0] |= (x[..., -1] >> self._last_bit) & one
+            east[..., -1] |= (x[..., 0] & one) << self._last_bit
+        # Nothing can live in the padding bits
+        west[..., -1] &= self._last_mask
+
+    def _shift_rows(
+        self, x: np.ndarray, above: np.ndarray, below: np.ndarray
+    ) -> None:
+        """`above` (`below`) holds for each row the row above (below)"""
+        above[..., 1:, :] = x[..., :-1, :]
+        below[..., :-1, :] = x[..., 1:, :]
+        if self.wrap_rows:
+            above[..., 0, :] = x[..., -1, :]
+            below[..., -1, :] = x[..., 0, :]
+        else:
+            above[..., 0, :] = 0
+            below[..., -1, :] = 0
+
+    def _step(self) -> None:
+        x = self.words
+        west, east, tmp, s3, c3, s2, c2, extra = self._buffers
+        self._shift_columns(x, west, east, tmp)
+        # Sum of the west and east cells (2 bits: s2 + 2 * c2)
+        np.bitwise_xor(west, east, out=s2)
+        np.bitwise_and(west, east, out=c2)
+        # Sum of the west, centre and east cells (2 bits: s3 + 2 * c3)
+        np.bitwise_xor(s2, x, out=s3)
+        np.bitwise_and(s2, x, out=c3)
+        c3 |= c2
+        # Sums of the rows above and below
+        above_s, below_s, above_c, below_c = west, east, tmp, extra
+        self._shift_rows(s3, above_s, below_s)
+        self._shift_rows(c3, above_c, below_c)
+        # Units of the number of neighbours and their carry
+        ones, carry = s3, c3
+        np.bitwise_xor(above_s, below_s, out=ones)
+        np.bitwise_and(above_s, below_s, out=carry)
+        np.bitwise_and(ones, s2, out=above_s)
+        carry |= above_s
+        ones ^= s2
+        # The number of neighbours is 2 or 3 when exactly one of the bits
+        # of weight 2 (above_c, c2, below_c and carry) is set
+        odd, several = above_s, c2
+        np.bitwise_xor(above_c, c2, out=odd)
+        np.bitwise_and(above_c, c2, out=several)
+        np.bitwise_xor(below_c, carry, out=above_c)
+        np.bitwise_and(below_c, carry, out=below_c)
+        odd ^= above_c
+        several |= below_c
+        # Alive if 3 neighbours, or 2 neighbours and alive
+        ones |= x
+        np.invert(several, out=several)
+        np.bitwise_and(odd, ones, out=x)
+        x &= several
+
+    def board(self) -> np.ndarray:
+        """Read-only (..., H, W) uint8 board of the words"""
+        if self._board is None:
+            self._board = unpack(self.words, self.shape[-1])
+            self._board.flags.writeable = False
+        return self._board
+
+    def release(self) -> None:
+        """Gives the board back to the model (as a writable array)"""
+        board = self.model.__dict__.get(self.name)
+        if board is None or board is self._board:
+            board = unpack(self.words, self.shape[-1]).astype(self.dtype)
+            self.model.__dict__[self.name] = board
+        self._board = None
+
+    def run(self, n: int) -> None:
+        board = self.model.__dict__.get(self.name)
+        if board is not None and board is not self._board:
+            # A new board was given to the model
+            self.words[...] = pack(board)
+        for _ in range(n):
+            self._step()
+        # The board is unpacked again when it is read
+        self.model.__dict__.pop(self.name, None)
+        self._board = None
@@ -0,0 +1,112 @@
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+
+class Profiler:
+    """Time spent in each phase of the computation of a model.
+
+    The model adds the time of its phases ("reaction", "diffusion" and
+    "update" of the NumPy Euler step, "halo exchange" and "bands" of the
+    Threads backend, "step" for the other integrators and backends,
+    "record") and of each `compute_turing` call. Other phases (e.g. the
+    display of the widget) can be added from any thread with `phase`.
+
+    With `memory=True`, the largest memory allocated during a step is
+    measured with `tracemalloc` (the model then computes one step at a
+    time), which slows down the computation.
+    """
+
+    def __init__(self, memory: bool = False) -> None:
+        self.memory = memory
+        self._lock = threading.Lock()
+        # Only the tracing started here is stopped by `stop`
+        self._tracing = memory and not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.seconds: Dict[str, float] = {}
+            self.calls: Dict[str, int] = {}
+            self.steps = 0
+            self.compute_seconds = 0.0
+            # Largest memory allocated during one `computing` call
+            self.peak_bytes = 0
+
+    def add(self, name: str, seconds: float, calls: int = 1) -> None:
+        with self._lock:
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+            self.calls[name] = self.calls.get(name, 0) + calls
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    @contextmanager
+    def computing(self, steps: int) -> Iterator[None]:
+        """Measures the computation of `steps` steps"""
+        memory = self.memory and tracemalloc.is_tracing()
+        if memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self.steps += steps
+                self.compute_seconds += seconds
+                if memory:
+                    peak = tracemalloc.get_traced_memory()[1]
+                    self.peak_bytes = max(self.peak_bytes, peak - base)
+
+    def stop(self) -> None:
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def summary(self) -> Dict[str, Any]:
+        """Steps per second, milliseconds per step (and number of calls)
+        of each phase and largest number of bytes allocated by a step
+        (None if the memory is not measured)
+        """
+        with self._lock:
+            steps = max(self.steps, 1)
+            return {
+                "steps": self.steps,
+                "steps_per_second": (
+                    self.steps / self.compute_seconds
+                    if 0 < self.compute_seconds
+                    else None
+                ),
+                "ms_per_step": {
+                    name: 1000 * seconds / steps
+                    for name, seconds in self.seconds.items()
+                },
+                "calls": dict(self.calls),
+                "bytes_per_step": (self.peak_bytes if self.memory else None),
+            }
+
+    def __str__(self) -> str:
+        summary = self.summary()
+        speed = summary["steps_per_second"]
+        lines = [
+            f"{summary['steps']} steps"
+            + (f", {speed:.1f} steps/s" if speed is not None else "")
+        ]
+        for name, ms in summary["ms_per_step"].items():
+            lines.append(f"  {name}: {ms:.3f} ms/step")
+        if summary["bytes_per_step"] is not None:
+            lines.append(
+                f"  allocated: {summary['bytes_per_step']:.0f} B/step (max)"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,224 @@
+import os
+import queue
+import struct
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class _NpyWriter:
+    """Appends frames to one `.npy` file per concentration.
+
+    The frames are streamed at the end of the file. Its header is written
+    with room for the largest possible number of frames and rewritten with
+    the actual one on close, so the files can be opened with
+    `np.load(..., mmap_mode="r")`.
+    """
+
+    _reserved_frames = 10**15
+
+    def __init__(
+        self,
+        path: str,
+        names: Sequence[str],
+        shape: Tuple[int, ...],
+        dtypes: Dict[str, np.dtype],
+    ) -> None:
+        self.shape = shape
+        self.dtypes = dtypes
+        self.files = {}
+        self.header_lengths = {}
+        for name in names:
+            header = self._header(name, self._reserved_frames)
+            f = open(os.path.join(path, f"{name}.npy"), "wb")
+            f.write(header)
+            self.files[name] = f
+            self.header_lengths[name] = len(header)
+
+    def _header(
+        self, name: str, nb_frames: int, length: Optional[int] = None
+    ) -> bytes:
+        header = repr(
+            {
+                "descr": np.lib.format.dtype_to_descr(self.dtypes[name]),
+                "fortran_order": False,
+                "shape": (nb_frames,) + self.shape,
+            }
+        )
+        prefix = np.lib.format.magic(1, 0)
+        if length is None:
+            # Aligned on 64 bytes as numpy does (+1 for the final "\n")
+            length = -(-(len(prefix) + 2 + len(header) + 1) // 64) * 64
+        header = header.ljust(length - len(prefix) - 2 - 1) + "\n"
+        return prefix + struct.pack("<H", len(header)) + header.encode()
+
+    def append(self, index: int, name: str, frame: np.ndarray) -> None:
+        frame.tofile(self.files[name])
+
+    def close(self, nb_frames: int) -> None:
+        for name, f in self.files.items():
+            f.seek(0)
+            f.write(self._header(name, nb_frames, self.header_lengths[name]))
+            f.close()
+
+
+class _ZarrWriter:
+    """Appends frames to one chunked and compressed zarr array per
+    concentration
+    """
+
+    def __init__(
+        self,
+        path: str,
+        names: Sequence[str],
+        shape: Tuple[int, ...],
+        dtypes: Dict[str, np.dtype],
+        chunk_frames: int,
+    ) -> None:
+        try:
+            import zarr
+        except ImportError as e:
+            raise ImportError(
+                "zarr is required to record in a .zarr store, "
+                "use another path to record .npy files"
+            ) from e
+
+        self.chunk_frames = chunk_frames
+        self.arrays = {
+            name: zarr.open_array(
+                store=os.path.join(path, name),
+                mode="w",
+                shape=(0,) + shape,
+                chunks=(chunk_frames,) + shape,
+                dtype=dtypes[name],
+            )
+            for name in names
+        }
+
+    def append(self, index: int, name: str, frame: np.ndarray) -> None:
+        array = self.arrays[name]
+        if array.shape[0] <= index:
+            # Growing by whole chunks to limit the metadata writes
+            array.resize((index + self.chunk_frames,) + array.shape[1:])
+        array[index] = frame
+
+    def close(self, nb_frames: int) -> None:
+        for array in self.arrays.values():
+            array.resize((nb_frames,) + array.shape[1:])
+
+
+class Recorder:
+    """Records states of a model into the directory `path`, one array of
+    shape (nb frames,) + shape of the concentration per concentration
+    (`<path>/<concentration>.npy`, or zarr arrays if `path` ends with
+    `.zarr`) and the step of each frame in `steps.npy`.
+
+    The states are copied into a fixed number of buffers and written by
+    a background thread. When the writer is `max_queue` frames late,
+    `record` waits for it, so the memory used stays bounded.
+    """
+
+    def __init__(
+        self,
+        model,
+        path: str,
+        every: int = 1,
+        concentrations: Optional[Sequence[str]] = None,
+        chunk_frames: int = 16,
+        max_queue: int = 4,
+    ) -> None:
+        if every < 1:
+            raise ValueError(f"Recording every {every} steps is not possible")
+        self.path = path
+        self.every = every
+        if concentrations is None:
+            concentrations = model.concentrations
+        self.concentrations = list(concentrations)
+        self.shape = model[self.concentrations[0]].shape
+        dtypes = {c: model[c].dtype for c in self.concentrations}
+        os.makedirs(path, exist_ok=True)
+        if path.rstrip("/\\").endswith(".zarr"):
+            self._writer = _ZarrWriter(
+                path, self.concentrations, self.shape, dtypes, chunk_frames
+            )
+        else:
+            self._writer = _NpyWriter(
+                path, self.concentrations, self.shape, dtypes
+            )
+        self.nb_frames = 0
+        self.steps: List[int] = []
+        self._error: Optional[BaseException] = None
+        self._free: queue.Queue = queue.Queue()
+        for _ in range(max_queue + 1):
+            self._free.put(
+                {
+                    c: np.empty(self.shape, dtype=dtypes[c])
+                    for c in self.concentrations
+                }
+            )
+        self._pending: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(
+            target=self._write, name="napari-turing-recorder", daemon=True
+        )
+        self._thread.start()
+
+    def _write(self) -> None:
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            index, buffers = item
+            try:
+                if self._error is None:
+                    for c, frame in buffers.items():
+                        self._writer.append(index, c, frame)
+            except BaseException as e:
+                # Raised in the thread of the model by the next `record`
+                self._error = e
+            self._free.put(buffers)
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(
+                f"The recording in {self.path} failed"
+            ) from self._error
+
+    def steps_to_next(self, step: int) -> int:
+        """Number of steps from `step` to the next recorded step"""
+        return self.every - step % self.every
+
+    def record(self, model) -> None:
+        """Queues the current state of `model` to be written"""
+        self._raise_error()
+        if self._thread is None:
+            raise RuntimeError(f"The recording in {self.path} is closed")
+        buffers = self._free.get()
+        for c in self.concentrations:
+            if model[c].shape != self.shape:
+                self._free.put(buffers)
+                raise ValueError(
+                    f"The shape of {c} changed during the recording "
+                    f"({self.shape} -> {model[c].shape})"
+                )
+            np.copyto(buffers[c], model[c])
+        self._pending.put((self.nb_frames, buffers))
+        self.nb_frames += 1
+        self.steps.append(model.steps)
+
+    def close(self) -> None:
+        """Waits for the queued frames to be written and closes the files"""
+        if self._thread is None:
+            return
+        self._pending.put(None)
+        self._thread.join()
+        self._thread = None
+        self._writer.close(self.nb_frames)
+        np.save(os.path.join(self.path, "steps.npy"), np.array(self.steps))
+        self._raise_error()
+
+    def __enter__(self) -> "Recorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
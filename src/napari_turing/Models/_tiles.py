@@ -0,0 +1,260 @@
+from typing import List
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+from ._bands import copy_parameters, make_proxy
+from ._TuringPattern import Boundaries
+
+
+def _tiles(array: np.ndarray, size: int, halo: int) -> np.ndarray:
+    """(rows of tiles, columns of tiles, size + 2 * halo, size + 2 * halo)
+    view of the tiles of `array` (whose first `halo` rows and columns are
+    the halo of the first tiles), neighbouring tiles share their halos
+    """
+    s0, s1 = array.strides
+    nb_rows = (array.shape[0] - 2 * halo) // size
+    nb_columns = (array.shape[1] - 2 * halo) // size
+    return as_strided(
+        array,
+        shape=(nb_rows, nb_columns, size + 2 * halo, size + 2 * halo),
+        strides=(size * s0, size * s1, s0, s1),
+    )
+
+
+class ActiveTiles:
+    """Euler stepping of the tiles of a model that are not at rest.
+
+    The grid is cut into tiles of `size` x `size` cells. A tile whose cells
+    and whose neighbouring cells did not change during a step computes
+    the same (zero) increments at the next step, so only the tiles that
+    changed and their neighbouring tiles are stepped. These active tiles
+    are stacked with a halo of one cell and stepped at once by a shallow
+    copy of the model (as the members of an ensemble). When more than
+    `dense_fraction` of the tiles are active, the whole grid is stepped.
+    When the model is restricted to a domain (see `set_mask`), the tiles
+    without any cell of the domain are never stepped, so a small domain
+    within a large grid costs in proportion to its area.
+
+    With floating point concentrations, diffusion makes tiny changes
+    spread of one cell per step. A tile whose increments are all at most
+    `tolerance` is considered at rest (its increments are no longer
+    computed until a neighbouring tile changes), the default 0 gives the
+    same result as stepping the whole grid.
+
+    The concentrations surrounded by a halo (holding the values of the
+    opposite side of the grid on wrapped axes, zeros otherwise) and padded
+    to a whole number of tiles are the reference state, the concentrations
+    of the model being read-only views of their interior between two
+    runs. A new array given to the model is copied in at the next run
+    (all its tiles become active), so that the whole grid is neither
+    compared nor copied at each run. `active_tiles` holds the number of
+    tiles stepped at each step of the last run.
+    """
+
+    def __init__(
+        self,
+        model,
+        size: int = 32,
+        dense_fraction: float = 0.5,
+        tolerance: float = 0,
+    ) -> None:
+        self.model = model
+        self.size = size
+        self.dense_fraction = dense_fraction
+        self.tolerance = tolerance
+        self.boundaries = model.boundaries
+        self.kernel = model.kernel
+        self.mask = model.mask
+        self.shape = model[model.concentrations[0]].shape
+        self.wrap_rows, self.wrap_columns = model.boundaries.wrapped_axes
+        H, W = self.shape
+        self.nb_tiles = (-(-H // size), -(-W // size))
+        padded_shape = (
+            self.nb_tiles[0] * size + 2,
+            self.nb_tiles[1] * size + 2,
+        )
+        self.padded = {
+            c: np.zeros(padded_shape, dtype=model[c].dtype) for c in model
+        }
+        self._windows = {c: _tiles(p, size, 1) for c, p in self.padded.items()}
+        # Concentrations of the model between two runs
+        self._views = {
+            c: p[1 : H + 1, 1 : W + 1] for c, p in self.padded.items()
+        }
+        for view in self._views.values():
+            view.flags.writeable = False
+        self._interiors = {
+            c: _tiles(p[1:-1, 1:-1], size, 0) for c, p in self.padded.items()
+        }
+        nb_neighbs = np.zeros(padded_shape, dtype=model.nb_neighbs.dtype)
+        nb_neighbs[1 : H + 1, 1 : W + 1] = model.nb_neighbs
+        self._nb_windows = _tiles(nb_neighbs, size, 1)
+        # Cells of the tiles that are in the grid and in the domain (None
+        # if all of them)
+        self._inside = None
+        self._domain = None
+        if H % size or W % size or model.masked:
+            domain = np.zeros(padded_shape, dtype=bool)
+            domain[1 : H + 1, 1 : W + 1] = model.mask
+            self._inside = _tiles(domain[1:-1, 1:-1], size, 0)
+            if model.masked:
+                self._domain = domain
+        # Tiles with at least one cell of the domain
+        self.domain_tiles = np.ones(self.nb_tiles, dtype=bool)
+        if model.masked:
+            self.domain_tiles = self._inside.any(axis=(2, 3))
+        # The tiles are closed, their halo holds the neighbouring values
+        self.dense = make_proxy(model)
+        self.dense.boundaries = Boundaries.Closed
+        self.dense._nb_neighbs = nb_neighbs
+        for c in model:
+            self.dense[c] = self.padded[c]
+        self.sparse = make_proxy(model)
+        self.sparse.boundaries = Boundaries.Closed
+        self.changed = self.domain_tiles.copy()
+        self.active_tiles: List[int] = []
+        self._parameters = None
+
+    def matches(
+        self,
+        model,
+        size: int = 32,
+        dense_fraction: float = 0.5,
+        tolerance: float = 0,
+    ) -> bool:
+        return (
+            self.model is model
+            and self.size == size
+            and self.dense_fraction == dense_fraction
+            and self.tolerance == tolerance
+            and self.boundaries == model.boundaries
+            and self.kernel == model.kernel
+            and self.mask is model.mask
+            and self.shape == model[model.concentrations[0]].shape
+            and all(self.padded[c].dtype == model[c].dtype for c in model)
+        )
+
+    def _scalar_parameters(self) -> dict:
+        return {
+            k: v
+            for k, v in self.model.__dict__.items()
+            if isinstance(v, (int, float, str)) and k != "steps"
+        }
+
+    def scatter(self) -> None:
+        """Copies the parameters and the new concentrations of the model
+        into the padded state, every tile is active if they changed since
+        the last run
+        """
+        parameters = self._scalar_parameters()
+        if parameters != self._parameters:
+            self.changed[...] = self.domain_tiles
+        self._parameters = parameters
+        for proxy in (self.dense, self.sparse):
+            copy_parameters(self.model, proxy)
+        copied = False
+        for c in self.model:
+            if self.model[c] is not self._views[c]:
+                H, W = self.shape
+                self.padded[c][1 : H + 1, 1 : W + 1] = self.model[c]
+                self.model[c] = self._views[c]
+                copied = True
+            self.dense[c] = self.padded[c]
+        if copied:
+            self.changed[...] = self.domain_tiles
+            self._exchange_halos()
+
+    def release(self) -> None:
+        """Gives the model its own (contiguous) concentrations back"""
+        for c in self.model:
+            if self.model[c] is self._views[c]:
+                self.model[c] = self._views[c].copy()
+
+    def _exchange_halos(self) -> None:
+        H, W = self.shape
+        for p in self.padded.values():
+            if self.wrap_columns:
+                p[1 : H + 1, 0] = p[1 : H + 1, W]
+                p[1 : H + 1, W + 1] = p[1 : H + 1, 1]
+            if self.wrap_rows:
+                p[0] = p[H]
+                p[H + 1] = p[1]
+
+    def _dilate(self, changed: np.ndarray) -> np.ndarray:
+        """Tiles that changed and their neighbouring tiles"""
+        rows = changed.copy()
+        rows[1:] |= changed[:-1]
+        rows[:-1] |= changed[1:]
+        if self.wrap_rows:
+            rows[0] |= changed[-1]
+            rows[-1] |= changed[0]
+        active = rows.copy()
+        active[:, 1:] |= rows[:, :-1]
+        active[:, :-1] |= rows[:, 1:]
+        if self.wrap_columns:
+            active[:, 0] |= rows[:, -1]
+            active[:, -1] |= rows[:, 0]
+        return active
+
+    def _moved(self, increment: np.ndarray) -> np.ndarray:
+        if self.tolerance == 0:
+            return increment != 0
+        return self.tolerance < np.abs(increment)
+
+    def _step_dense(self) -> None:
+        H, W = self.shape
+        size = self.size
+        derivatives = self.dense._derivatives()
+        changed = np.zeros(self.nb_tiles, dtype=bool)
+        for c, p in self.padded.items():
+            increment = derivatives[c]
+            increment *= self.dense.dt
+            # Only the cells of the grid change
+            increment[0] = 0
+            increment[H + 1 :] = 0
+            increment[:, 0] = 0
+            increment[:, W + 1 :] = 0
+            if self._domain is not None:
+                increment *= self._domain
+            changed |= (
+                self._moved(increment[1:-1, 1:-1])
+                .reshape(self.nb_tiles[0], size, self.nb_tiles[1], size)
+                .any(axis=(1, 3))
+            )
+            p += increment
+        self.changed = changed
+
+    def _step_sparse(self, rows: np.ndarray, columns: np.ndarray) -> None:
+        proxy = self.sparse
+        for c in self.model:
+            proxy[c] = self._windows[c][rows, columns]
+        proxy._nb_neighbs = self._nb_windows[rows, columns]
+        derivatives = proxy._derivatives()
+        changed = np.zeros(len(rows), dtype=bool)
+        for c in self.model:
+            increment = derivatives[c][:, 1:-1, 1:-1]
+            increment *= proxy.dt
+            if self._inside is not None:
+                increment *= self._inside[rows, columns]
+            changed |= self._moved(increment).any(axis=(1, 2))
+            increment += proxy[c][:, 1:-1, 1:-1]
+            self._interiors[c][rows, columns] = increment
+        self.changed = np.zeros(self.nb_tiles, dtype=bool)
+        self.changed[rows[changed], columns[changed]] = True
+
+    def run(self, n: int) -> None:
+        self.scatter()
+        self.active_tiles = []
+        nb_tiles = self.changed.size
+        for _ in range(n):
+            active = self._dilate(self.changed)
+            if self._domain is not None:
+                active &= self.domain_tiles
+            nb_active = int(np.count_nonzero(active))
+            if self.dense_fraction * nb_tiles < nb_active:
+                self._step_dense()
+            elif 0 < nb_active:
+                self._step_sparse(*np.nonzero(active))
+            self._exchange_halos()
+            self.active_tiles.append(nb_active)
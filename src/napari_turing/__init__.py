@@ -1,4 +1,17 @@
 __version__ = "1.0.0"
-from ._widget import TuringViewer
 from .Models._TuringPattern import TuringPattern
 from .Models._model_list import *
+from ._sweep import sweep
+
+
+def __getattr__(name):
+    # The widget (and so Qt and napari) is only imported when needed
+    # so the models can be run headless
+    if name == "TuringViewer":
+        from ._widget import TuringViewer
+
+        return TuringViewer
+    # The models are imported when they are first used
+    if name in AvailableModels.__members__:
+        return AvailableModels[name].value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,245 @@
+"""
+Headless runner of the models, it never imports Qt, magicgui or napari.
+
+    napari-turing-run GrayScott --steps 10000 --frame-every 100 \
+        --param k=0.063 --param F=0.03 --output gray_scott.npy
+
+or equivalently `python -m napari_turing ...`
+"""
+
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from .Models._model_list import AvailableModels
+from .Models._TuringPattern import (
+    Backend,
+    Boundaries,
+    DiffusionDirection,
+    Integrator,
+)
+
+
+def _parse_parameter(text: str):
+    name, _, value = text.partition("=")
+    if not value:
+        raise argparse.ArgumentTypeError(
+            f"Parameters are given as name=value ({text!r})"
+        )
+    # Converted once the model is known (see `_typed_parameters`)
+    return name, value.split(",")
+
+
+def _parameter_type(model, name: str) -> type:
+    """Type of the parameter `name` of `model`: the dtype of its
+    `ModelParameter` or the type of the class attribute (e.g. the `rule`
+    of the Game of Life)
+    """
+    for parameter in model._necessary_parameters:
+        if parameter.name == name:
+            return parameter.dtype
+    value = getattr(model, name, None)
+    if name.startswith(("_", "default_")) or not isinstance(
+        value, (int, float, str)
+    ):
+        raise ValueError(f"{model.__name__} has no parameter {name!r}")
+    return type(value)
+
+
+def _typed_parameters(model, parameters) -> dict:
+    """Values of the --param options converted to the types of the
+    parameters of `model`, a list of values for an ensemble
+    """
+    typed = {}
+    for name, texts in parameters:
+        kind = _parameter_type(model, name)
+        values = []
+        for text in texts:
+            try:
+                if kind is str:
+                    value = text
+                elif kind is int:
+                    value = float(text)
+                    if not value.is_integer():
+                        raise ValueError
+                    value = int(value)
+                else:
+                    value = kind(float(text))
+            except ValueError:
+                raise ValueError(
+                    f"{name} must be of type {kind.__name__} ({text!r})"
+                ) from None
+            values.append(value)
+        typed[name] = values[0] if len(values) == 1 else values
+    return typed
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="napari-turing-run",
+        description="Runs a reaction-diffusion model without napari "
+        "and writes its frames in a .npy file of shape "
+        "(nb frames, nb concentrations, size, size) "
+        "(or size, size, size for 3D volumes)",
+    )
+    parser.add_argument("model", choices=[m.name for m in AvailableModels])
+    parser.add_argument(
+        "--steps", type=int, default=1000, help="Number of steps to run"
+    )
+    parser.add_argument(
+        "--frame-every",
+        type=int,
+        default=None,
+        help="Number of steps between two frames, dividing --steps (the "
+        "increment of the model by default)",
+    )
+    parser.add_argument(
+        "-o", "--output", default=None, help="Output .npy file of the frames"
+    )
+    parser.add_argument(
+        "-p",
+        "--param",
+        type=_parse_parameter,
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Value of a model parameter (default values otherwise), "
+        "comma separated values run an ensemble",
+    )
+    parser.add_argument("--size", type=int, default=None)
+    parser.add_argument(
+        "--ndim",
+        type=int,
+        choices=[2, 3],
+        default=None,
+        help="Number of dimensions of the grid (3 for a volume)",
+    )
+    parser.add_argument("--dt", type=float, default=None)
+    parser.add_argument("--dx", type=float, default=None)
+    parser.add_argument("--dy", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--boundaries", choices=[b.value for b in Boundaries], default=None
+    )
+    parser.add_argument(
+        "--kernel", choices=[k.name for k in DiffusionDirection], default=None
+    )
+    parser.add_argument(
+        "--integrator", choices=[i.value for i in Integrator], default=None
+    )
+    parser.add_argument(
+        "--backend", choices=[b.value for b in Backend], default=None
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--mask",
+        default=None,
+        help=".npy file whose non-zero cells are the domain of the model "
+        "(the whole grid by default)",
+    )
+    parser.add_argument(
+        "--coarse-levels",
+        type=int,
+        default=0,
+        help="Number of coarser grids (2, 4, ... times coarser) run "
+        "before the first frame to warm start the model",
+    )
+    parser.add_argument(
+        "--coarse-steps",
+        type=int,
+        default=None,
+        help="Number of steps run on each coarser grid (--steps by default)",
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=["float32", "float64"],
+        default=None,
+        help="Precision of the concentrations",
+    )
+    return parser
+
+
+def _frame_every(args: argparse.Namespace) -> int:
+    """Number of steps between two frames, dividing the number of steps"""
+    model = AvailableModels[args.model].value
+    frame_every = args.frame_every or model.increment.value
+    if args.steps % frame_every != 0:
+        raise ValueError(
+            f"--steps ({args.steps}) must be a multiple of --frame-every "
+            f"({frame_every})"
+        )
+    return frame_every
+
+
+def run(args: argparse.Namespace) -> Optional[np.memmap]:
+    model = AvailableModels[args.model].value
+    parameters = model.default_parameters()
+    parameters.update(_typed_parameters(model, args.param))
+    tr = model(
+        concentrations=model._concentration_names,
+        size=args.size,
+        ndim=args.ndim,
+        mask=args.mask and np.load(args.mask),
+        dt=args.dt,
+        dx=args.dx,
+        dy=args.dy,
+        seed=args.seed,
+        boundaries=args.boundaries and Boundaries(args.boundaries),
+        kernel=args.kernel and DiffusionDirection[args.kernel],
+        integrator=args.integrator and Integrator(args.integrator),
+        backend=args.backend and Backend(args.backend),
+        workers=args.workers,
+        dtype=args.dtype,
+        **parameters,
+    )
+    frame_every = _frame_every(args)
+    nb_frames = args.steps // frame_every + 1
+    shape = (nb_frames, len(tr.concentrations)) + tr[
+        tr.concentrations[0]
+    ].shape
+    dtype = np.result_type(*[tr[c] for c in tr])
+    # The frames are only kept in a file (never in memory)
+    frames = None
+    if args.output is not None:
+        frames = np.lib.format.open_memmap(
+            args.output, mode="w+", dtype=dtype, shape=shape
+        )
+    if 0 < args.coarse_levels:
+        tr.compute_coarse_to_fine(
+            0, args.coarse_levels, coarse_steps=args.coarse_steps or args.steps
+        )
+    start = time.perf_counter()
+    for frame in range(nb_frames):
+        if 0 < frame:
+            tr.compute_turing(frame_every)
+        if frames is not None:
+            for i, c in enumerate(tr):
+                frames[frame, i] = tr[c]
+            frames.flush()
+    duration = time.perf_counter() - start
+    steps = (nb_frames - 1) * frame_every
+    print(
+        f"{args.model}: {steps} steps in {duration:.2f}s "
+        f"({steps / max(duration, 1e-9):.1f} steps/s), "
+        f"{nb_frames} frames"
+        + (f" written to {args.output}" if args.output else "")
+    )
+    return frames
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    try:
+        _typed_parameters(AvailableModels[args.model].value, args.param)
+        _frame_every(args)
+    except ValueError as e:
+        parser.error(str(e))
+    run(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,139 @@
+import threading
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class FrameBuffer:
+    """Latest frame published by a simulation thread for a display thread.
+
+    The simulation copies its state into a back buffer and swaps it with
+    the pending frame, the display takes the pending frame when there is a
+    new one. The taken frame belongs to the display until its next `take`,
+    so it is never written while it is rendered, and the simulation never
+    waits for the display: the frames published between two `take` are
+    dropped except the last one.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._back: Optional[np.ndarray] = None
+        self._pending: Optional[np.ndarray] = None
+        self._front: Optional[np.ndarray] = None
+        self._step = 0
+        self._new = False
+        # Number of frames published but never taken
+        self.dropped = 0
+
+    def publish(self, frame: np.ndarray, step: int = 0) -> None:
+        """Copies `frame` (reached at the step `step`) into the buffer"""
+        back = self._back
+        if (
+            back is None
+            or back.shape != frame.shape
+            or back.dtype != frame.dtype
+        ):
+            back = np.empty_like(frame)
+        np.copyto(back, frame)
+        with self._lock:
+            self._back, self._pending = self._pending, back
+            if self._new:
+                self.dropped += 1
+            self._step = step
+            self._new = True
+
+    def take(self) -> Optional[Tuple[np.ndarray, int]]:
+        """Latest published frame and its step, None if no frame was
+        published since the last call
+        """
+        with self._lock:
+            if not self._new:
+                return None
+            self._front, self._pending = self._pending, self._front
+            self._new = False
+            return self._front, self._step
+
+    def clear(self) -> None:
+        """Drops the frame not taken yet"""
+        with self._lock:
+            self._new = False
+
+
+class RateLimiter:
+    """Slows down a loop to at most `rate` steps per second (no limit if
+    `rate` is None or 0)
+    """
+
+    def __init__(self, rate: Optional[float] = None) -> None:
+        self.rate = rate
+        self._start = time.perf_counter()
+        self._steps = 0
+
+    def reset(self) -> None:
+        self._start = time.perf_counter()
+        self._steps = 0
+
+    def wait(self, steps: int) -> None:
+        """Sleeps until `steps` more steps are allowed since the reset"""
+        self._steps += steps
+        if not self.rate:
+            return
+        delay = self._start + self._steps / self.rate - time.perf_counter()
+        if 0 < delay:
+            time.sleep(delay)
+        elif delay < -1:
+            # Too slow to follow the rate, not catching up with a burst
+            self.reset()
+
+
+class StepTuner:
+    """Number of steps to compute per frame to display `fps` frames per
+    second.
+
+    The speed of the simulation (steps per second) is measured at each
+    frame and smoothed, the number of steps is then at most doubled or
+    halved from one frame to the next and kept within
+    [`min_steps`, `max_steps`].
+    """
+
+    def __init__(
+        self,
+        fps: float = 30,
+        steps: int = 1,
+        min_steps: int = 1,
+        max_steps: Optional[int] = None,
+        smoothing: float = 0.5,
+    ) -> None:
+        self.fps = fps
+        self.min_steps = min_steps
+        self.max_steps = max_steps
+        self.smoothing = smoothing
+        self.steps = self._bounded(steps)
+        # Measured steps per second
+        self.speed: Optional[float] = None
+
+    def _bounded(self, steps: float) -> int:
+        steps = max(self.min_steps, int(round(steps)))
+        if self.max_steps is not None:
+            steps = min(self.max_steps, steps)
+        return steps
+
+    def update(self, steps: int, duration: float) -> int:
+        """Number of steps of the next frame knowing that the last frame
+        computed `steps` steps in `duration` seconds
+        """
+        if duration <= 0:
+            return self._bounded(2 * self.steps)
+        speed = steps / duration
+        if self.speed is None:
+            self.speed = speed
+        else:
+            self.speed = (
+                self.smoothing * self.speed + (1 - self.smoothing) * speed
+            )
+        target = self.speed / self.fps
+        self.steps = self._bounded(
+            min(max(target, self.steps / 2), 2 * self.steps)
+        )
+        return self.steps
@@ -0,0 +1,164 @@
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+
+from .Models._TuringPattern import TuringPattern
+
+
+def _run(
+    model: Type[TuringPattern],
+    parameters: Dict[str, Any],
+    seed: Optional[int],
+    n_steps: int,
+    tol: Optional[float],
+    check_every: int,
+    states_file: str,
+    index: int,
+) -> Dict[str, Any]:
+    """Runs a single simulation of a sweep and writes its final state
+    at `index` in `states_file`
+    """
+    start = time.perf_counter()
+    tr = model(
+        concentrations=model._concentration_names, seed=seed, **parameters
+    )
+    steps = tr.compute_turing(n_steps, tol=tol, check_every=check_every)
+    states = np.load(states_file, mmap_mode="r+")
+    for i, c in enumerate(tr):
+        states[index, i] = tr[c]
+    states.flush()
+    del states
+    return {
+        "steps": steps,
+        **tr.convergence,
+        "finite": all(bool(np.isfinite(tr[c]).all()) for c in tr),
+        "wall_time": time.perf_counter() - start,
+        "concentrations": {
+            c: {
+                "mean": float(np.mean(tr[c])),
+                "std": float(np.std(tr[c])),
+                "min": float(np.min(tr[c])),
+                "max": float(np.max(tr[c])),
+            }
+            for c in tr
+        },
+    }
+
+
+def sweep(
+    model: Union[Type[TuringPattern], Enum],
+    parameters: Dict[str, Sequence],
+    store: str,
+    seeds: Sequence[Optional[int]] = (0,),
+    n_steps: int = 1000,
+    tol: Optional[float] = None,
+    check_every: int = 100,
+    max_workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Runs `model` for every combination of the `parameters` values and
+    of the `seeds` in a pool of processes.
+
+    Args:
+        model: model class (or member of `AvailableModels`)
+        parameters: values to explore for each parameter, the parameters
+            that are not given take their default value. The grid
+            parameters `size`, `ndim`, `dt`, `dx` and `dy` can be swept
+            too.
+        store: directory where the results are written. The final states
+            are stored in one `states_<shape>.npy` file per grid shape
+            (shape (nb runs, nb concentrations) + grid shape) and the
+            parameters and summary metrics of the runs in `runs.json`.
+        seeds: seeds of the random initial conditions
+        n_steps: maximum number of steps of each run
+        tol: if given, a run stops once the relative change of its
+            concentrations over `check_every` steps is below `tol`, or
+            once it comes back to one of its last checked states (see
+            `TuringPattern.compute_turing`)
+        check_every: number of steps between two convergence checks
+        max_workers: number of processes (all the cores if None)
+
+    Returns:
+        the list of the runs, with their parameters, seed, metrics and
+        where to find their final state in `store`
+    """
+    if isinstance(model, Enum):
+        model = model.value
+    os.makedirs(store, exist_ok=True)
+    names = list(parameters)
+    runs = []
+    for values in itertools.product(*parameters.values()):
+        for seed in seeds:
+            run_parameters = model.default_parameters()
+            run_parameters.update(zip(names, values))
+            runs.append({"parameters": run_parameters, "seed": seed})
+
+    # One pre-allocated state file per grid shape
+    shapes: Dict[Tuple[int, ...], List[int]] = {}
+    for i, run in enumerate(runs):
+        size = run["parameters"].get("size", model.default_size)
+        ndim = run["parameters"].get("ndim", model.default_ndim)
+        shapes.setdefault((size,) * ndim, []).append(i)
+    for shape, indices in shapes.items():
+        # The type of the states is the one of a run of this shape (the
+        # initial state of some models does not fit in smaller grids)
+        probe = model(
+            concentrations=model._concentration_names,
+            **runs[indices[0]]["parameters"],
+        )
+        dtype = np.result_type(*[probe[c] for c in probe])
+        del probe
+        states_file = os.path.join(
+            store, f"states_{'x'.join(map(str, shape))}.npy"
+        )
+        np.lib.format.open_memmap(
+            states_file,
+            mode="w+",
+            dtype=dtype,
+            shape=(len(indices), len(model._concentration_names)) + shape,
+        ).flush()
+        for index, i in enumerate(indices):
+            runs[i]["states_file"] = os.path.basename(states_file)
+            runs[i]["index"] = index
+
+    # Fresh processes (rather than forks) since forking a process running
+    # threads (numba, BLAS, `Threads` backend) can deadlock
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers, mp_context=context) as pool:
+        futures = [
+            pool.submit(
+                _run,
+                model,
+                run["parameters"],
+                run["seed"],
+                n_steps,
+                tol,
+                check_every,
+                os.path.join(store, run["states_file"]),
+                run["index"],
+            )
+            for run in runs
+        ]
+        for run, future in zip(runs, futures):
+            run.update(future.result())
+
+    with open(os.path.join(store, "runs.json"), "w") as f:
+        json.dump(
+            {
+                "model": model.__name__,
+                "concentrations": model._concentration_names,
+                "runs": runs,
+            },
+            f,
+            indent=2,
+            default=lambda o: (
+                o.item() if isinstance(o, np.generic) else str(o)
+            ),
+        )
+    return runs
@@ -0,0 +1,7 @@
+def create_model(model, **kwargs):
+    """Instance of `model` with its default parameters (overridden by
+    `kwargs`)
+    """
+    params = model.default_parameters()
+    params.update(kwargs)
+    return model(concentrations=model._concentration_names, **params)
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from napari_turing import TuringPattern
+from napari_turing.Models._model_list import AvailableModels
+from napari_turing.Models._TuringPattern import (
+    Backend,
+    Boundaries,
+    DiffusionDirection,
+    Integrator,
+)
+
+from ._helpers import create_model
+
+
+@pytest.mark.parametrize("model", [m.value for m in AvailableModels])
+def test_resumed_run_matches_uninterrupted_run(model, tmp_path):
+    tr = create_model(
+        model,
+        seed=0,
+        size=30,
+        boundaries=Boundaries.Left_Right_Tube,
+        kernel=DiffusionDirection.Left,
+    )
+    tr.compute_turing(7)
+    path = str(tmp_path / "run.ntc")
+    tr.save_checkpoint(path)
+    resumed = TuringPattern.load_checkpoint(path)
+    assert type(resumed) is model
+    assert resumed.steps == 7
+    assert resumed.boundaries == tr.boundaries
+    assert resumed.kernel == tr.kernel
+    tr.compute_turing(13)
+    resumed.compute_turing(13)
+    for c in tr:
+        np.testing.assert_array_equal(resumed[c], tr[c])
+    assert resumed.rng.random() == tr.rng.random()
+    # The run goes back to the same initial state
+    tr.reset()
+    resumed.reset()
+    for c in tr:
+        np.testing.assert_array_equal(resumed[c], tr[c])
+
+
+def test_checkpoint_of_an_ensemble(tmp_path):
+    model = AvailableModels.GrayScott.value
+    tr = create_model(
+        model,
+        seed=0,
+        size=20,
+        k=[0.06, 0.062],
+        dtype="float32",
+        integrator=Integrator.Adaptive,
+        backend=Backend.Threads,
+    )
+    tr.compute_turing(5)
+    path = str(tmp_path / "ensemble.ntc")
+    tr.save_checkpoint(path)
+    resumed = model.load_checkpoint(path)
+    assert resumed.dtype == np.float32
+    assert resumed.integrator == Integrator.Adaptive
+    assert resumed.backend == Backend.Threads
+    np.testing.assert_array_equal(resumed.k, tr.k)
+    tr.compute_turing(5)
+    resumed.compute_turing(5)
+    for c in tr:
+        np.testing.assert_array_equal(resumed[c], tr[c])
+
+
+def test_loaded_arrays_are_copy_on_write(tmp_path):
+    model = AvailableModels.GameOfLife.value
+    tr = create_model(model, size=20)
+    path = str(tmp_path / "life.ntc")
+    tr.save_checkpoint(path)
+    resumed = model.load_checkpoint(path)
+    resumed.compute_turing(10)
+    np.testing.assert_array_equal(model.load_checkpoint(path).Board, tr.Board)
+
+
+def test_load_checkpoint_errors(tmp_path):
+    path = str(tmp_path / "life.ntc")
+    create_model(AvailableModels.GameOfLife.value, size=20).save_checkpoint(
+        path
+    )
+    with pytest.raises(ValueError):
+        AvailableModels.GrayScott.value.load_checkpoint(path)
+    other = tmp_path / "other.ntc"
+    other.write_bytes(b"not a checkpoint")
+    with pytest.raises(ValueError):
+        TuringPattern.load_checkpoint(str(other))
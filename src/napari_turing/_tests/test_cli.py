@@ -0,0 +1,92 @@
+import json
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from napari_turing._cli import create_parser, main, run
+
+
+def test_cli_does_not_import_qt_or_napari():
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "import napari_turing._cli\n"
+        "duration = time.perf_counter() - start\n"
+        "gui = ['qtpy', 'magicgui', 'napari']\n"
+        "gui = [m for m in gui if m in sys.modules]\n"
+        "print(json.dumps({'gui': gui, 'duration': duration}))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    result = json.loads(out.splitlines()[-1])
+    assert result["gui"] == []
+    # About the cost of importing numpy and scipy (0.3 s)
+    assert result["duration"] < 1
+
+
+def test_cli_writes_frames(tmp_path):
+    output = tmp_path / "frames.npy"
+    main(
+        [
+            "GrayScott",
+            "--steps",
+            "20",
+            "--frame-every",
+            "5",
+            "--size",
+            "32",
+            "--seed",
+            "0",
+            "--param",
+            "k=0.05",
+            "--output",
+            str(output),
+        ]
+    )
+    frames = np.load(output)
+    assert frames.shape == (5, 2, 32, 32)
+    assert np.isfinite(frames).all()
+    assert not np.array_equal(frames[0], frames[-1])
+
+
+def test_cli_converts_the_parameters_to_their_types(tmp_path):
+    output = tmp_path / "frames.npy"
+    main(
+        [
+            "GrayScott",
+            "--steps",
+            "4",
+            "--frame-every",
+            "2",
+            "--size",
+            "32",
+            "--param",
+            "nb_pos=10",
+            "--output",
+            str(output),
+        ]
+    )
+    assert np.load(output).shape == (3, 2, 32, 32)
+    main(["GameOfLife", "--steps", "2", "--size", "16", "-p", "rule=B36/S23"])
+    for parameter in ["foo=1", "nb_pos=1.5", "k=high"]:
+        with pytest.raises(SystemExit):
+            main(["GrayScott", "--steps", "2", "--param", parameter])
+
+
+def test_cli_rejects_a_partial_last_frame(capsys):
+    with pytest.raises(SystemExit):
+        main(["GrayScott", "--steps", "150", "--frame-every", "100"])
+    assert "multiple of --frame-every" in capsys.readouterr().err
+
+
+def test_cli_keeps_no_frame_without_output():
+    args = create_parser().parse_args(
+        ["GrayScott", "--steps", "4", "--frame-every", "2", "--size", "16"]
+    )
+    assert run(args) is None
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import numpy as np
+
+from napari_turing._frames import FrameBuffer, RateLimiter, StepTuner
+
+
+def test_frame_buffer_gives_the_latest_frame_once():
+    frames = FrameBuffer()
+    assert frames.take() is None
+    state = np.zeros((4, 4))
+    for step in range(1, 4):
+        state[...] = step
+        frames.publish(state, step)
+    frame, step = frames.take()
+    assert step == 3 and (frame == 3).all()
+    assert frames.dropped == 2
+    assert frames.take() is None
+    frames.publish(state, 4)
+    frames.clear()
+    assert frames.take() is None
+
+
+def test_taken_frame_is_not_overwritten():
+    frames = FrameBuffer()
+    frames.publish(np.zeros(3), 0)
+    frame, _ = frames.take()
+    for step in range(1, 10):
+        frames.publish(np.full(3, step), step)
+    assert (frame == 0).all()
+    assert (frames.take()[0] == 9).all()
+
+
+def test_frame_buffer_between_threads():
+    frames = FrameBuffer()
+    done = threading.Event()
+
+    def simulate():
+        for step in range(2000):
+            frames.publish(np.full(1000, step), step)
+        done.set()
+
+    thread = threading.Thread(target=simulate)
+    thread.start()
+    last = -1
+    while not done.is_set() or last < 1999:
+        taken = frames.take()
+        if taken is not None:
+            frame, step = taken
+            # A frame is never torn
+            assert (frame == step).all() and last < step
+            last = step
+    thread.join()
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(1000)
+    start = time.perf_counter()
+    for _ in range(10):
+        limiter.wait(10)
+    assert 0.09 < time.perf_counter() - start
+    limiter = RateLimiter()
+    start = time.perf_counter()
+    limiter.wait(10**9)
+    assert time.perf_counter() - start < 0.05
+
+
+def test_step_tuner_reaches_the_frame_rate():
+    tuner = StepTuner(fps=30, steps=1, max_steps=1000)
+    # 1 ms per step: 33 steps per frame at 30 frames per second
+    for _ in range(30):
+        steps = tuner.steps
+        tuner.update(steps, steps * 1e-3)
+    assert abs(tuner.steps - 33) <= 1
+    # Steps become 10 times slower, the next frames follow
+    for _ in range(30):
+        steps = tuner.steps
+        tuner.update(steps, steps * 1e-2)
+    assert abs(tuner.steps - 3) <= 1
+    # Very fast steps stay within the bounds
+    for _ in range(30):
+        tuner.update(tuner.steps, tuner.steps * 1e-9)
+    assert tuner.steps == 1000
@@ -0,0 +1,72 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+MODEL_MODULES = [
+    "napari_turing.Models.FitzHughNagumo",
+    "napari_turing.Models.Brusselator",
+    "napari_turing.Models.GrayScott",
+    "napari_turing.Models.GameOfLife",
+]
+HEAVY_MODULES = ["scipy.ndimage", "scipy.fft", "skimage", "numba"]
+# Libraries imported by the widget
+GUI_MODULES = [
+    "numpy",
+    "qtpy.QtWidgets",
+    "magicgui.widgets",
+    "napari.layers",
+    "napari.qt.threading",
+]
+
+
+def _import(module, watched, preloaded=()):
+    """Imports `module` in a fresh interpreter (where the `preloaded`
+    modules are already imported) and returns the import duration and the
+    `watched` modules that were imported with it
+    """
+    code = (
+        "import json, sys, time\n"
+        + "".join(f"import {m}\n" for m in preloaded)
+        + "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "duration = time.perf_counter() - start\n"
+        f"heavy = [m for m in {watched!r} if m in sys.modules]\n"
+        "print(json.dumps({'heavy': heavy, 'duration': duration}))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def test_package_import_is_lazy():
+    result = _import("napari_turing", HEAVY_MODULES + MODEL_MODULES)
+    assert result["heavy"] == []
+    assert result["duration"] < 5
+
+
+def test_widget_import_is_lazy():
+    pytest.importorskip("napari")
+    # napari itself imports scikit-image and numba
+    # Once the GUI libraries are imported, the widget itself costs a few
+    # tens of milliseconds
+    result = _import(
+        "napari_turing._widget",
+        MODEL_MODULES,
+        preloaded=GUI_MODULES,
+    )
+    assert result["heavy"] == []
+    assert result["duration"] < 0.5
+
+
+def test_models_are_imported_on_first_use():
+    from napari_turing import GrayScott
+    from napari_turing.Models._model_list import AvailableModels
+
+    assert AvailableModels.GrayScott.value is GrayScott
+    assert GrayScott.__name__ == "GrayScott"
@@ -0,0 +1,715 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+from scipy.ndimage import convolve
+
+from napari_turing.Models._model_list import AvailableModels
+from napari_turing.Models._TuringPattern import (
+    Backend,
+    Boundaries,
+    DiffusionDirection,
+    Integrator,
+)
+
+from ._helpers import create_model
+
+
+@pytest.mark.parametrize("model", [m.value for m in AvailableModels])
+def test_inplace_step_matches_allocating_step(model):
+    tr_inplace = create_model(model, seed=0)
+    tr_alloc = create_model(model, seed=0)
+    for _ in range(20):
+        tr_inplace._step_inplace()
+        tr_alloc._step()
+    for c in tr_inplace:
+        np.testing.assert_allclose(tr_inplace[c], tr_alloc[c], atol=1e-12)
+
+
+@pytest.mark.parametrize("model", [m.value for m in AvailableModels])
+def test_inplace_step_does_not_allocate_grids(model):
+    tr = create_model(model, size=200, seed=0)
+    tr.compute_turing(1)
+    tracemalloc.start()
+    tr.compute_turing(5)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < tr[tr.concentrations[0]].nbytes / 4
+
+
+@pytest.mark.parametrize("boundaries", list(Boundaries))
+def test_neighbour_sum_matches_padded_convolution(boundaries):
+    tr = create_model(AvailableModels.FitzHughNagumo.value, size=30)
+    tr.boundaries = boundaries
+    arr = np.random.default_rng(0).random((30, 30))
+    kernel = np.arange(9).reshape(3, 3)
+    wrap_rows, wrap_columns = boundaries.wrapped_axes
+    padded = np.pad(
+        arr, ((1, 1), (0, 0)), mode="wrap" if wrap_rows else "constant"
+    )
+    padded = np.pad(
+        padded, ((0, 0), (1, 1)), mode="wrap" if wrap_columns else "constant"
+    )
+    expected = convolve(padded, kernel, mode="constant")[1:-1, 1:-1]
+    np.testing.assert_allclose(tr._neighbour_sum(arr, kernel), expected)
+
+
+@pytest.mark.parametrize("boundaries", list(Boundaries))
+def test_isotropic_diffusion_conserves_mass(boundaries):
+    tr = create_model(
+        AvailableModels.FitzHughNagumo.value,
+        boundaries=boundaries,
+        kernel=DiffusionDirection.Isotrope,
+    )
+    assert abs(tr._diffusion("A").sum()) < 1e-9
+
+
+@pytest.mark.parametrize(
+    "model, parameters",
+    [
+        (AvailableModels.GrayScott.value, {"k": [0.05, 0.063, 0.07]}),
+        (
+            AvailableModels.FitzHughNagumo.value,
+            {"tau": [0.1, 0.5, 1.0], "k": [-5e-3, 0, 5e-3]},
+        ),
+    ],
+)
+def test_ensemble_matches_individual_runs(model, parameters):
+    ensemble = create_model(model, size=40, seed=0, **parameters)
+    assert ensemble.ensemble_size == 3
+    members = []
+    for i in range(3):
+        member = create_model(
+            model, size=40, **{p: v[i] for p, v in parameters.items()}
+        )
+        for c in member:
+            member[c] = ensemble[c][i].copy()
+        members.append(member)
+    ensemble.compute_turing(20)
+    for i, member in enumerate(members):
+        member.compute_turing(20)
+        for c in member:
+            np.testing.assert_allclose(ensemble[c][i], member[c], atol=1e-12)
+
+
+@pytest.mark.parametrize(
+    "model",
+    [AvailableModels.GrayScott.value, AvailableModels.Brusselator.value],
+)
+def test_ensemble_members_have_their_own_initial_positions(model):
+    tr = create_model(model, size=50, seed=0, mu_x=[0.1, 0.15, 0.2])
+    seeds = tr.init_Y != np.median(tr.init_Y)
+    assert 0 < seeds[0].sum() <= tr.nb_pos
+    assert not np.array_equal(seeds[0], seeds[1])
+    assert not np.array_equal(seeds[1], seeds[2])
+
+
+def test_ensemble_parameters_must_have_the_same_length():
+    with pytest.raises(ValueError):
+        create_model(
+            AvailableModels.GrayScott.value, k=[0.05, 0.06], F=[0.03] * 3
+        )
+
+
+@pytest.mark.parametrize("kernel", list(DiffusionDirection))
+def test_spectral_integrator_matches_euler_for_small_dt(kernel):
+    model = AvailableModels.FitzHughNagumo.value
+    kwargs = dict(seed=0, kernel=kernel, boundaries=Boundaries.Inifinite)
+    tr_euler = create_model(model, **kwargs)
+    tr_spectral = create_model(model, integrator=Integrator.Spectral, **kwargs)
+    tr_euler.compute_turing(100)
+    tr_spectral.compute_turing(100)
+    for c in tr_euler:
+        np.testing.assert_allclose(tr_euler[c], tr_spectral[c], atol=5e-2)
+
+
+def test_spectral_integrator_is_stable_for_large_dt():
+    model = AvailableModels.FitzHughNagumo.value
+    kwargs = dict(seed=0, dt=0.05, boundaries=Boundaries.Inifinite)
+    tr_spectral = create_model(model, integrator=Integrator.Spectral, **kwargs)
+    tr_spectral.compute_turing(100)
+    assert np.isfinite(tr_spectral.A).all()
+    assert np.abs(tr_spectral.A).max() < 2
+
+
+def test_spectral_integrator_requires_periodic_boundaries():
+    tr = create_model(
+        AvailableModels.GrayScott.value, integrator=Integrator.Spectral
+    )
+    with pytest.raises(ValueError):
+        tr.compute_turing(1)
+
+
+def test_adaptive_integrator_caps_dt_to_the_stability_limit():
+    tr = create_model(
+        AvailableModels.FitzHughNagumo.value,
+        seed=0,
+        dt=1,
+        integrator=Integrator.Adaptive,
+    )
+    tr.compute_turing(50)
+    assert tr.dt <= tr.stable_dt()
+    for c in tr:
+        assert np.isfinite(tr[c]).all()
+
+
+def test_adaptive_integrator_rolls_back_non_finite_steps():
+    tr = create_model(
+        AvailableModels.GrayScott.value, integrator=Integrator.Adaptive
+    )
+    tr.X[10, 10] = np.inf
+    before = {c: tr[c].copy() for c in tr}
+    with pytest.raises(FloatingPointError):
+        with np.errstate(invalid="ignore", over="ignore"):
+            tr.compute_turing(1)
+    for c in tr:
+        np.testing.assert_array_equal(tr[c], before[c])
+
+
+@pytest.mark.parametrize("model", [m.value for m in AvailableModels])
+@pytest.mark.parametrize("boundaries", list(Boundaries))
+@pytest.mark.parametrize(
+    "kernel", [DiffusionDirection.Isotrope, DiffusionDirection.Left]
+)
+def test_numba_backend_matches_numpy_backend(model, boundaries, kernel):
+    pytest.importorskip("numba")
+    kwargs = dict(seed=0, size=50, boundaries=boundaries, kernel=kernel)
+    tr_numpy = create_model(model, **kwargs)
+    tr_numba = create_model(model, backend=Backend.Numba, **kwargs)
+    tr_numpy.compute_turing(20)
+    tr_numba.compute_turing(20)
+    for c in tr_numpy:
+        np.testing.assert_allclose(tr_numba[c], tr_numpy[c], atol=1e-12)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_numba_laplacian_computes_in_the_model_precision(dtype):
+    numba = pytest.importorskip("numba")
+    from napari_turing.Models._numba_kernels import _neighbour_sum
+
+    arr = np.arange(9, dtype=dtype).reshape(3, 3)
+    weights = np.ones(4, dtype=dtype)
+    assert _neighbour_sum(arr, 1, 1, weights, False, False) == 16
+    (signature,) = [
+        s
+        for s in _neighbour_sum.nopython_signatures
+        if s.args[0].dtype == numba.from_dtype(np.dtype(dtype))
+    ]
+    assert signature.return_type == numba.from_dtype(np.dtype(dtype))
+
+
+@pytest.mark.parametrize(
+    "model",
+    [AvailableModels.GrayScott.value, AvailableModels.GameOfLife.value],
+)
+@pytest.mark.parametrize("boundaries", list(Boundaries))
+def test_threads_backend_matches_numpy_backend(model, boundaries):
+    kwargs = dict(seed=0, size=50, boundaries=boundaries)
+    tr_numpy = create_model(model, **kwargs)
+    tr_threads = create_model(
+        model, backend=Backend.Threads, workers=3, **kwargs
+    )
+    tr_numpy.compute_turing(20)
+    tr_threads.compute_turing(10)
+    tr_threads.compute_turing(10)
+    for c in tr_numpy:
+        np.testing.assert_allclose(tr_threads[c], tr_numpy[c], atol=1e-12)
+
+
+@pytest.mark.parametrize(
+    "model",
+    [AvailableModels.GrayScott.value, AvailableModels.GameOfLife.value],
+)
+@pytest.mark.parametrize("boundaries", list(Boundaries))
+def test_tiles_backend_matches_numpy_backend(model, boundaries):
+    kwargs = dict(seed=0, size=70, boundaries=boundaries)
+    tr_numpy = create_model(model, **kwargs)
+    tr_tiles = create_model(
+        model, backend=Backend.Tiles, tile_size=16, **kwargs
+    )
+    tr_numpy.compute_turing(30)
+    tr_tiles.compute_turing(30)
+    # Modified between two runs, every tile has to be stepped again (the
+    # concentrations stepped by tiles are read-only, new ones are given)
+    c = tr_numpy.concentrations[0]
+    with pytest.raises(ValueError):
+        tr_tiles[c][60:, 60:] = 1
+    for tr in (tr_numpy, tr_tiles):
+        modified = tr[c].copy()
+        modified[60:, 60:] = 1
+        tr[c] = modified
+        tr.compute_turing(30)
+    for c in tr_numpy:
+        np.testing.assert_allclose(tr_tiles[c], tr_numpy[c], atol=1e-12)
+
+
+def test_tiles_backend_skips_the_tiles_at_rest():
+    model = AvailableModels.GameOfLife.value
+    tr = create_model(model, size=64, backend=Backend.Tiles, tile_size=16)
+    tr.Board[...] = 0
+    # A still life and a blinker
+    tr.Board[5:7, 5:7] = 1
+    tr.Board[40, 39:42] = 1
+    tr.compute_turing(4)
+    # Only the tiles around the blinker after the first step
+    assert tr.active_tiles == [16, 9, 9, 9]
+    assert tr.Board[5:7, 5:7].all() and tr.Board[40, 39:42].all()
+
+
+@pytest.mark.parametrize("model", [m.value for m in AvailableModels])
+@pytest.mark.parametrize("backend", [Backend.NumPy, Backend.Threads])
+def test_float32_models_stay_float32_and_close_to_float64(model, backend):
+    kwargs = dict(seed=0, size=50, backend=backend, workers=2)
+    tr64 = create_model(model, **kwargs)
+    tr32 = create_model(model, dtype=np.float32, **kwargs)
+    tr64.compute_turing(100)
+    tr32.compute_turing(100)
+    for c in tr32:
+        if np.issubdtype(tr64[c].dtype, np.floating):
+            assert tr32[c].dtype == np.float32
+            assert tr32[f"init_{c}"].dtype == np.float32
+        np.testing.assert_allclose(tr32[c], tr64[c], atol=1e-4)
+
+
+def test_dtype_must_be_floating():
+    with pytest.raises(ValueError):
+        create_model(AvailableModels.GrayScott.value, dtype=int)
+
+
+@pytest.mark.parametrize("boundaries", list(Boundaries))
+@pytest.mark.parametrize("size", [7, 64, 130])
+def test_packed_game_of_life_matches_numpy_backend(boundaries, size):
+    model = AvailableModels.GameOfLife.value
+    kwargs = dict(size=size, boundaries=boundaries, ensemble_size=2)
+    tr_numpy = create_model(model, **kwargs)
+    tr_numpy.Board[...] = (
+        np.random.default_rng(0).random((2, size, size)) < 0.4
+    )
+    tr_packed = create_model(model, backend=Backend.Packed, **kwargs)
+    tr_packed.Board[...] = tr_numpy.Board
+    tr_numpy.compute_turing(30)
+    tr_packed.compute_turing(7)
+    tr_packed.compute_turing(23)
+    np.testing.assert_array_equal(tr_packed.Board, tr_numpy.Board)
+
+
+def test_packed_game_of_life_keeps_the_board_in_bits(monkeypatch, tmp_path):
+    from napari_turing.Models import _packed_life
+
+    pack, packed = _packed_life.pack, []
+
+    def counting_pack(board):
+        packed.append(board)
+        return pack(board)
+
+    monkeypatch.setattr(_packed_life, "pack", counting_pack)
+    model = AvailableModels.GameOfLife.value
+    size = 200
+    tr_numpy = create_model(model, size=size)
+    tr_numpy.Board[...] = np.random.default_rng(0).random((size, size)) < 0.4
+    tr_packed = create_model(model, size=size, backend=Backend.Packed)
+    assert tr_packed.Board.dtype == np.uint8
+    tr_packed.Board = tr_numpy.Board.copy()
+    tr_numpy.compute_turing(5)
+    tr_packed.compute_turing(5)
+    # One bit per cell (4 words of 64 bits per row), no board is kept
+    # between the runs
+    assert tr_packed._packed.words.nbytes == size * 4 * 8
+    assert "Board" not in tr_packed.__dict__
+    board = tr_packed.Board
+    assert board.dtype == np.uint8 and not board.flags.writeable
+    np.testing.assert_array_equal(board, tr_numpy.Board)
+    # Reading the board does not pack it again, assigning a board does
+    tr_numpy.compute_turing(3)
+    tr_packed.compute_turing(3)
+    np.testing.assert_array_equal(tr_packed["Board"], tr_numpy.Board)
+    assert len(packed) == 1
+    tr_packed.Board = tr_numpy.Board.copy()
+    tr_numpy.compute_turing(2)
+    tr_packed.compute_turing(2)
+    assert len(packed) == 2
+    # Checkpoints and the other backends get the unpacked board
+    tr_packed.save_checkpoint(tmp_path / "life.ntc")
+    loaded = model.load_checkpoint(tmp_path / "life.ntc")
+    np.testing.assert_array_equal(loaded.Board, tr_numpy.Board)
+    tr_packed.backend = Backend.NumPy
+    tr_numpy.compute_turing(4)
+    tr_packed.compute_turing(4)
+    assert "_packed" not in tr_packed.__dict__
+    np.testing.assert_array_equal(tr_packed.Board, tr_numpy.Board)
+
+
+@pytest.mark.parametrize("max_nodes", [2**20, 100])
+def test_hashlife_matches_numpy_backend_away_from_the_edges(max_nodes):
+    model = AvailableModels.GameOfLife.value
+    kwargs = dict(size=130, ensemble_size=2)
+    tr_numpy = create_model(model, boundaries=Boundaries.Closed, **kwargs)
+    tr_numpy.Board[...] = 0
+    soup = np.random.default_rng(0).random((2, 30, 30)) < 0.4
+    tr_numpy.Board[:, 50:80, 45:75] = soup
+    tr_hashlife = create_model(
+        model,
+        backend=Backend.HashLife,
+        hashlife_max_nodes=max_nodes,
+        **kwargs,
+    )
+    tr_hashlife.Board[...] = tr_numpy.Board
+    for n in (1, 6, 13, 3, 7):
+        tr_numpy.compute_turing(n)
+        tr_hashlife.compute_turing(n)
+        np.testing.assert_array_equal(tr_hashlife.Board, tr_numpy.Board)
+
+
+def test_hashlife_jumps_far_in_time():
+    tr = create_model(
+        AvailableModels.GameOfLife.value, size=40, backend=Backend.HashLife
+    )
+    tr.Board[...] = 0
+    glider = np.array([[0, 1, 0], [0, 0, 1], [1, 1, 1]])
+    tr.Board[:3, :3] = glider
+    # A glider moves of one cell diagonally every 4 generations, it
+    # leaves the board and does not come back on an unbounded plane
+    tr.compute_turing(4 * 20)
+    np.testing.assert_array_equal(tr.Board[20:23, 20:23], glider)
+    assert tr.Board.sum() == glider.sum()
+    tr.compute_turing(2**40)
+    assert tr.Board.sum() == 0
+
+
+@pytest.mark.parametrize(
+    "rule, expected",
+    [
+        ("B3/S23", ({3}, {2, 3}, 2)),
+        ("b36/s23", ({3, 6}, {2, 3}, 2)),
+        ("S23/B3", ({3}, {2, 3}, 2)),
+        ("23/3", ({3}, {2, 3}, 2)),
+        ("B2/S/C3", ({2}, set(), 3)),
+        ("/2/3", ({2}, set(), 3)),
+    ],
+)
+def test_parse_life_rules(rule, expected):
+    from napari_turing.Models._life_rules import parse_rule
+
+    assert parse_rule(rule) == expected
+
+
+@pytest.mark.parametrize("rule", ["B3", "B3/S29", "B3/S2/C1", "B3/B2", "x"])
+def test_invalid_life_rules(rule):
+    with pytest.raises(ValueError):
+        create_model(AvailableModels.GameOfLife.value, rule=rule)
+
+
+def _generations_step(board, birth, survival, states):
+    alive = (board == 1).astype(int)
+    padded = np.pad(alive, 1, mode="wrap")
+    count = sum(
+        np.roll(np.roll(padded, i, 0), j, 1)[1:-1, 1:-1]
+        for i in (-1, 0, 1)
+        for j in (-1, 0, 1)
+        if i or j
+    )
+    new = np.where(board == 0, np.isin(count, list(birth)), 0)
+    new = np.where(
+        board == 1, np.where(np.isin(count, list(survival)), 1, 2), new
+    )
+    new = np.where(1 < board, board + 1, new)
+    return new % states
+
+
+def test_ensemble_of_life_rules_matches_reference():
+    rules = [
+        ("B3/S23", {3}, {2, 3}, 2),
+        ("B36/S23", {3, 6}, {2, 3}, 2),
+        ("B2/S/C3", {2}, set(), 3),
+        ("B2/S345/C4", {2}, {3, 4, 5}, 4),
+    ]
+    tr = create_model(
+        AvailableModels.GameOfLife.value,
+        size=40,
+        rule=[r[0] for r in rules],
+        boundaries=Boundaries.Inifinite,
+    )
+    assert tr.ensemble_size == len(rules)
+    tr.Board[...] = np.random.default_rng(0).random(tr.Board.shape) < 0.3
+    expected = tr.Board.copy()
+    tr.compute_turing(10)
+    for _ in range(10):
+        expected = np.stack(
+            [_generations_step(b, *r[1:]) for b, r in zip(expected, rules)]
+        )
+    np.testing.assert_array_equal(tr.Board, expected)
+
+
+def test_compute_turing_stops_at_steady_state_and_periodic_regime():
+    model = AvailableModels.GameOfLife.value
+    tr = create_model(model, size=20)
+    assert tr.compute_turing(3) == 3
+    assert not tr.convergence["converged"]
+    tr.reset()
+    tr.Board[...] = 0
+    tr.Board[5:7, 5:7] = 1
+    assert tr.compute_turing(100, tol=1e-6, check_every=10) == 10
+    assert tr.convergence["converged"] and tr.convergence["period"] is None
+    # A blinker comes back to its state every 2 steps
+    tr.reset()
+    tr.Board[...] = 0
+    tr.Board[10, 9:12] = 1
+    assert tr.compute_turing(100, tol=1e-6, check_every=1) == 2
+    assert tr.convergence["period"] == 2
+    # Not detected if only the last checked state is kept
+    tr.reset()
+    tr.Board[...] = 0
+    tr.Board[10, 9:12] = 1
+    assert tr.compute_turing(10, tol=1e-6, check_every=1, max_period=1) == 10
+    assert not tr.convergence["converged"]
+
+
+def test_compute_turing_checks_the_last_partial_chunk():
+    tr = create_model(AvailableModels.GameOfLife.value, size=20)
+    # Three cells of a block, the block is complete after one generation
+    tr.Board[...] = 0
+    tr.Board[5:7, 5] = 1
+    tr.Board[5, 6] = 1
+    assert tr.compute_turing(7, tol=1e-6, check_every=5) == 7
+    assert tr.convergence["converged"] and tr.convergence["period"] is None
+    # A blinker checked at the step 3 then 4 comes back at 4 to its
+    # initial state
+    tr.reset()
+    tr.Board[...] = 0
+    tr.Board[10, 9:12] = 1
+    assert tr.compute_turing(4, tol=1e-6, check_every=3) == 4
+    assert tr.convergence["period"] == 4
+
+
+@pytest.mark.parametrize("boundaries", list(Boundaries))
+def test_3d_laplacian_is_the_7_point_stencil(boundaries):
+    tr = create_model(
+        AvailableModels.FitzHughNagumo.value,
+        size=10,
+        ndim=3,
+        boundaries=boundaries,
+    )
+    assert tr.A.shape == (10, 10, 10)
+    arr = np.random.default_rng(0).random((10, 10, 10))
+    expected = np.zeros_like(arr)
+    for axis, wrap in enumerate(boundaries.wrapped(3)):
+        for shift in (1, -1):
+            neighbours = np.roll(arr, shift, axis=axis)
+            if not wrap:
+                edge = [slice(None)] * 3
+                edge[axis] = 0 if shift == 1 else -1
+                neighbours[tuple(edge)] = 0
+            expected += neighbours
+    stencil = DiffusionDirection.Isotrope.stencil(3)
+    np.testing.assert_allclose(tr._neighbour_sum(arr, stencil), expected)
+    assert abs(tr._diffusion("A").sum()) < 1e-9
+
+
+def test_3d_spectral_integrator_matches_euler_for_small_dt():
+    model = AvailableModels.FitzHughNagumo.value
+    kwargs = dict(seed=0, size=20, ndim=3, boundaries=Boundaries.Inifinite)
+    tr_euler = create_model(model, **kwargs)
+    tr_spectral = create_model(model, integrator=Integrator.Spectral, **kwargs)
+    tr_euler.compute_turing(100)
+    tr_spectral.compute_turing(100)
+    for c in tr_euler:
+        np.testing.assert_allclose(tr_euler[c], tr_spectral[c], atol=5e-2)
+
+
+def test_3d_float32_ensemble():
+    tr = create_model(
+        AvailableModels.GrayScott.value,
+        size=16,
+        ndim=3,
+        dtype="float32",
+        k=[0.055, 0.063],
+    )
+    assert tr.X.shape == (2, 16, 16, 16) and tr.X.dtype == np.float32
+    tr.compute_turing(20)
+    assert np.isfinite(tr.X).all() and tr.X.dtype == np.float32
+
+
+def test_game_of_life_runs_in_2d_only():
+    with pytest.raises(ValueError):
+        create_model(AvailableModels.GameOfLife.value, ndim=3)
+
+
+def test_coarse_to_fine_warm_start():
+    model = AvailableModels.FitzHughNagumo.value
+    tr = create_model(model, size=64, seed=0, dtype="float32")
+    dx, dy = tr.dx, tr.dy
+    assert tr.compute_coarse_to_fine(10, levels=2, coarse_steps=30) == 10
+    assert tr.coarse_steps == [30, 30]
+    assert tr.A.shape == (64, 64) and tr.A.dtype == np.float32
+    assert (tr.dx, tr.dy) == (dx, dy)
+    assert np.isfinite(tr.A).all()
+    # The coarse grids cover the same domain: a smooth state is kept
+    tr = create_model(model, size=64, seed=0)
+    x = np.linspace(0, 2 * np.pi, 64, endpoint=False)
+    for c in tr:
+        tr[c][...] = 0.1 * np.sin(x)[:, None] * np.cos(x)[None, :]
+    expected = create_model(model, size=64, seed=0)
+    for c in tr:
+        expected[c][...] = tr[c]
+    tr.compute_coarse_to_fine(0, levels=1, coarse_steps=0)
+    for c in tr:
+        np.testing.assert_allclose(tr[c], expected[c], atol=1.5e-2)
+    # Without coarse grids it is compute_turing
+    tr.reset()
+    expected.reset()
+    tr.compute_coarse_to_fine(20, levels=0)
+    expected.compute_turing(20)
+    for c in tr:
+        np.testing.assert_array_equal(tr[c], expected[c])
+
+
+def test_coarse_to_fine_requires_floating_concentrations():
+    tr = create_model(AvailableModels.GameOfLife.value, size=32)
+    with pytest.raises(ValueError):
+        tr.compute_coarse_to_fine(10)
+    tr = create_model(AvailableModels.GrayScott.value, size=8)
+    with pytest.raises(ValueError):
+        tr.compute_coarse_to_fine(10, levels=3)
+
+
+def _ring(size, inner, outer):
+    y, x = np.mgrid[:size, :size] - size / 2
+    radius = np.hypot(y, x)
+    return (inner < radius) & (radius < outer)
+
+
+@pytest.mark.parametrize("model", [m.value for m in AvailableModels])
+@pytest.mark.parametrize("boundaries", list(Boundaries))
+def test_masked_domain_backends_match_numpy_backend(model, boundaries):
+    kwargs = dict(
+        size=70, seed=0, mask=_ring(70, 15, 33), boundaries=boundaries
+    )
+    tr = create_model(model, **kwargs)
+    assert tr.masked
+    # Stepping the whole grid
+    tr._step_all(20)
+    for backend in (Backend.NumPy, Backend.Threads, Backend.Tiles):
+        other = create_model(model, backend=backend, **kwargs)
+        other.tile_size = 16
+        other.compute_turing(20)
+        for c in tr:
+            np.testing.assert_allclose(other[c], tr[c], atol=1e-12)
+    for c in tr:
+        assert not tr[c][tr.mask == 0].any()
+
+
+def test_masked_domain_has_zero_flux_edges():
+    tr = create_model(
+        AvailableModels.FitzHughNagumo.value,
+        size=60,
+        mask=_ring(60, 10, 25),
+        kernel=DiffusionDirection.Isotrope,
+    )
+    assert abs((tr._diffusion("A") * tr.mask).sum()) < 1e-9
+    # The mask is resized to the grid
+    tr.set_mask(np.ones((10, 20)))
+    assert tr.mask.shape == (60, 60) and not tr.masked
+    with pytest.raises(ValueError):
+        tr.set_mask(np.ones((10, 20, 30)))
+    with pytest.raises(ValueError):
+        create_model(
+            AvailableModels.FitzHughNagumo.value,
+            mask=_ring(64, 10, 25),
+            boundaries=Boundaries.Inifinite,
+            integrator=Integrator.Spectral,
+        ).compute_turing(1)
+
+
+def test_tiles_backend_steps_only_the_tiles_of_the_domain():
+    mask = np.zeros((256, 256), dtype=bool)
+    mask[100:110, 20:230] = True
+    tr = create_model(
+        AvailableModels.FitzHughNagumo.value,
+        size=256,
+        seed=0,
+        mask=mask,
+        backend=Backend.Tiles,
+    )
+    tr.compute_turing(5)
+    # The band crosses one row of tiles over the 8 x 8 tiles
+    assert max(tr.active_tiles) <= 8
+
+
+def test_masked_domain_work_scales_with_the_domain():
+    mask = np.zeros((256, 256), dtype=bool)
+    mask[100:110, 20:230] = True
+    tr = create_model(
+        AvailableModels.FitzHughNagumo.value, size=256, seed=0, mask=mask
+    )
+    tr.compute_turing(5)
+    # The default backend steps the band of tiles of the domain
+    assert tr.backend == Backend.NumPy
+    assert max(tr.active_tiles) <= 8
+    # The concentrations stay in the padded tiles between two runs
+    tiles = tr._tiles
+    views = {c: tr[c] for c in tr}
+    tr.compute_turing(5)
+    for c in tr:
+        assert tr[c] is views[c]
+        assert np.shares_memory(tr[c], tiles.padded[c])
+    assert max(tr.active_tiles) <= 8
+
+
+def test_masked_domain_keeps_the_backend_of_large_domains(capsys):
+    model = AvailableModels.GrayScott.value
+    mask = np.ones((64, 64), dtype=bool)
+    mask[:4] = False
+    tr = create_model(model, size=64, mask=mask, backend=Backend.Threads)
+    tr.compute_turing(3)
+    assert "_bands" in tr.__dict__ and "_tiles" not in tr.__dict__
+    mask[10:] = False
+    tr = create_model(model, size=64, mask=mask, backend=Backend.Threads)
+    tr.compute_turing(3)
+    assert "_bands" not in tr.__dict__ and "_tiles" in tr.__dict__
+    assert "with the Threads backend" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"integrator": Integrator.Adaptive},
+        {"ensemble_size": 2, "backend": Backend.Threads},
+        {"ndim": 3, "size": 30},
+    ],
+)
+@pytest.mark.parametrize("boundaries", list(Boundaries))
+def test_masked_domain_steps_its_bounding_box(kwargs, boundaries):
+    model = AvailableModels.GrayScott.value
+    size = kwargs.get("size", 60)
+    ndim = kwargs.get("ndim", 2)
+    mask = np.zeros((size,) * ndim, dtype=bool)
+    mask[(slice(10, 25),) * ndim] = True
+    mask[(slice(0, 3),) + (slice(15, 20),) * (ndim - 1)] = True
+    kwargs = dict(kwargs, size=size, seed=0, mask=mask, boundaries=boundaries)
+    tr = create_model(model, **kwargs)
+    expected = create_model(model, **kwargs)
+    tr.compute_turing(10)
+    expected._step_all(10)
+    for c in tr:
+        np.testing.assert_allclose(tr[c], expected[c], atol=1e-12)
+    # Only the box of the domain and its halo is stepped, it spans the
+    # wrapped axes whose edge the domain reaches
+    cropped = tr._cropped()
+    if boundaries.wrapped(ndim)[0]:
+        assert cropped.mask.shape == (size,) + (17,) * (ndim - 1)
+    else:
+        assert cropped.mask.shape == (26,) + (17,) * (ndim - 1)
+    assert tr[tr.concentrations[0]].shape[-ndim:] == (size,) * ndim
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"dt": 0.5}, {"dt": 1.0}, {"integrator": Integrator.Adaptive}]
+)
+def test_game_of_life_steps_one_generation(kwargs):
+    model = AvailableModels.GameOfLife.value
+    tr = create_model(model, size=20, seed=0, **kwargs)
+    expected = create_model(model, size=20, seed=0)
+    assert tr.dt == 1 and tr.integrator == Integrator.Euler
+    tr.compute_turing(3)
+    expected.compute_turing(3)
+    np.testing.assert_array_equal(tr.Board, expected.Board)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from napari_turing.Models._model_list import AvailableModels
+from napari_turing.Models._TuringPattern import Backend, Integrator
+
+from ._helpers import create_model
+
+
+@pytest.mark.parametrize("model", [m.value for m in AvailableModels])
+def test_profiled_steps_match_steps(model):
+    tr = create_model(model, seed=0, size=30)
+    tr_profiled = create_model(model, seed=0, size=30)
+    profiler = tr_profiled.profile()
+    tr.compute_turing(10)
+    tr_profiled.compute_turing(10)
+    for c in tr:
+        np.testing.assert_array_equal(tr_profiled[c], tr[c])
+    summary = profiler.summary()
+    assert summary["steps"] == 10
+    assert 0 < summary["steps_per_second"]
+    assert set(summary["ms_per_step"]) == {"reaction", "diffusion", "update"}
+    assert summary["calls"]["update"] == 10
+    assert summary["bytes_per_step"] is None
+
+
+@pytest.mark.parametrize(
+    "kwargs, phases",
+    [
+        (dict(backend=Backend.Threads, workers=2), {"halo exchange", "bands"}),
+        (dict(integrator=Integrator.Adaptive), {"step"}),
+    ],
+)
+def test_profiled_phases_of_the_other_engines(kwargs, phases):
+    tr = create_model(AvailableModels.GrayScott.value, size=30, **kwargs)
+    profiler = tr.profile()
+    tr.compute_turing(5)
+    assert set(profiler.summary()["ms_per_step"]) == phases
+
+
+def test_profiling_memory_and_stop():
+    tr = create_model(AvailableModels.GrayScott.value, size=30)
+    profiler = tr.profile(memory=True)
+    tr.compute_turing(5)
+    assert tr.stop_profiling() is profiler
+    tr.compute_turing(5)
+    summary = profiler.summary()
+    assert summary["steps"] == 5
+    assert summary["bytes_per_step"] is not None
+    assert "reaction" in str(profiler)
+
+
+def test_profiling_memory_reports_the_largest_step():
+    tr = create_model(AvailableModels.GrayScott.value, size=30)
+    # Each step allocates (and frees) 8 MB
+    tr._step_profiled = lambda profiler: np.ones(10**6)
+    profiler = tr.profile(memory=True)
+    tr.compute_turing(5)
+    tr.stop_profiling()
+    assert 8 * 10**6 <= profiler.summary()["bytes_per_step"] < 9 * 10**6
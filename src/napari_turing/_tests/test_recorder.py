@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from napari_turing.Models._model_list import AvailableModels
+
+from ._helpers import create_model
+
+
+def _expected_frames(model, steps, every):
+    tr = create_model(model, size=30, seed=0)
+    frames = {c: [tr[c].copy()] for c in tr}
+    for _ in range(steps // every):
+        tr.compute_turing(every)
+        for c in tr:
+            frames[c].append(tr[c].copy())
+    return {c: np.stack(f) for c, f in frames.items()}
+
+
+@pytest.mark.parametrize("store", ["run", "run.zarr"])
+def test_recorder_writes_every_kth_state(tmp_path, store):
+    if store.endswith(".zarr"):
+        zarr = pytest.importorskip("zarr")
+    model = AvailableModels.GrayScott.value
+    path = str(tmp_path / store)
+    tr = create_model(model, size=30, seed=0)
+    tr.record(path, every=5, chunk_frames=2, max_queue=1)
+    # Chunks that do not align with the recording
+    for n in (3, 4, 6, 7):
+        tr.compute_turing(n)
+    tr.stop_recording()
+    assert tr.steps == 20
+    expected = _expected_frames(model, 20, 5)
+    np.testing.assert_array_equal(
+        np.load(f"{path}/steps.npy"), [0, 5, 10, 15, 20]
+    )
+    for c in tr:
+        if store.endswith(".zarr"):
+            frames = zarr.open_array(f"{path}/{c}", mode="r")[:]
+        else:
+            frames = np.load(f"{path}/{c}.npy", mmap_mode="r")
+        np.testing.assert_array_equal(frames, expected[c])
+
+
+def test_recorder_rejects_shape_changes(tmp_path):
+    tr = create_model(AvailableModels.GrayScott.value, size=30, seed=0)
+    recorder = tr.record(str(tmp_path / "run"))
+    tr.X = np.zeros((10, 10))
+    with pytest.raises(ValueError):
+        recorder.record(tr)
+    recorder.close()
@@ -0,0 +1,78 @@
+import json
+import os
+
+import numpy as np
+
+from napari_turing import sweep
+from napari_turing.Models._model_list import AvailableModels
+
+
+def test_seed_does_not_touch_global_random_state():
+    state = np.random.get_state()[1].copy()
+    model = AvailableModels.FitzHughNagumo.value
+    tr_1 = model(
+        concentrations=["A", "I"], seed=3, tau=0.1, k=0, mu_a=1, mu_i=1
+    )
+    tr_2 = model(
+        concentrations=["A", "I"], seed=3, tau=0.1, k=0, mu_a=1, mu_i=1
+    )
+    np.testing.assert_array_equal(tr_1.A, tr_2.A)
+    np.testing.assert_array_equal(np.random.get_state()[1], state)
+
+
+def test_sweep(tmp_path):
+    store = str(tmp_path / "sweep")
+    runs = sweep(
+        AvailableModels.GrayScott,
+        {"k": [0.05, 0.063], "size": [20, 30]},
+        store,
+        seeds=[0, 1],
+        n_steps=20,
+        max_workers=2,
+    )
+    assert len(runs) == 8
+    with open(os.path.join(store, "runs.json")) as f:
+        assert len(json.load(f)["runs"]) == 8
+    run = runs[-1]
+    assert run["steps"] == 20
+    states = np.load(os.path.join(store, run["states_file"]))
+    assert states.shape == (4, 2, 30, 30)
+    model = AvailableModels.GrayScott.value
+    tr = model(
+        concentrations=model._concentration_names,
+        seed=run["seed"],
+        **run["parameters"],
+    )
+    tr.compute_turing(20)
+    np.testing.assert_allclose(states[run["index"], 1], tr.Y)
+
+
+def test_sweep_stops_at_convergence(tmp_path):
+    runs = sweep(
+        AvailableModels.FitzHughNagumo,
+        {"k": [0.0]},
+        str(tmp_path),
+        n_steps=10000,
+        tol=1e-1,
+        check_every=10,
+        max_workers=1,
+    )
+    assert runs[0]["converged"]
+    assert runs[0]["steps"] < 10000
+
+
+def test_sweep_game_of_life(tmp_path):
+    runs = sweep(
+        AvailableModels.GameOfLife,
+        {"size": [20]},
+        str(tmp_path),
+        n_steps=4,
+        max_workers=1,
+    )
+    states = np.load(os.path.join(tmp_path, runs[0]["states_file"]))
+    assert states.shape == (1, 1, 20, 20)
+    assert np.issubdtype(states.dtype, np.integer)
+    model = AvailableModels.GameOfLife.value
+    tr = model(concentrations=model._concentration_names, size=20)
+    tr.compute_turing(4)
+    np.testing.assert_array_equal(states[0, 0], tr.Board)
@@ -8,25 +8,83 @@ Replace code below according to your needs.
 """
 
 import time
+import numpy as np
+from ._frames import FrameBuffer, RateLimiter, StepTuner
 from .Models._TuringPattern import Boundaries, DiffusionDirection
 from .Models._model_list import AvailableModels
-from qtpy.QtWidgets import QWidget, QVBoxLayout, QTabWidget, QPushButton
+from qtpy.QtCore import QTimer
+from qtpy.QtWidgets import (
+    QFileDialog,
+    QWidget,
+    QVBoxLayout,
+    QTabWidget,
+    QPushButton,
+)
 from magicgui import widgets
+from napari.layers import Labels
 from napari.qt.threading import thread_worker
 from functools import partial
 
 
 class ModelControler(QWidget):
+    # Number of times per second the display pulls the latest frame
+    display_rate = 60
+    # Number of milliseconds between two updates of the profiling readout
+    profile_every = 500
+
     def update_layer(self, data):
         self.image_layer.data = data
         self.image_layer.refresh()
 
+    def pull_frame(self):
+        frame = self.frames.take()
+        if frame is not None:
+            with self.tr._phase("display"):
+                self.update_layer(frame[0])
+            if self.auto_steps:
+                self.increment.value = self.tuner.steps
+
     @thread_worker
     def play_click_worker(self):
+        # The simulation runs as fast as allowed, the display takes the
+        # latest frame at its own pace (see `pull_frame`)
+        self.rate_limiter.reset()
         while True:
-            time.sleep(0.1)
-            self.tr.compute_turing(self.increment.value)
-            yield self.tr[self.concentration_show.value]
+            if self.auto_steps:
+                steps = self.tuner.steps
+            else:
+                steps = self.increment.value
+            start = time.perf_counter()
+            self.tr.compute_turing(steps)
+            with self.tr._phase("publish"):
+                self.frames.publish(self.tr[self.displayed], self.tr.steps)
+            self.tuner.update(steps, time.perf_counter() - start)
+            self.rate_limiter.wait(steps)
+            yield
+
+    def update_rate(self):
+        self.rate_limiter.rate = self.steps_per_second.value
+        self.rate_limiter.reset()
+
+    def update_profiling(self):
+        if self.profile_box.value:
+            self.tr.profile()
+        else:
+            self.tr.stop_profiling()
+            self.profile_label.value = ""
+
+    def show_profile(self):
+        profiler = self.tr.__dict__.get("_profiler")
+        if profiler is not None:
+            self.profile_label.value = (
+                f"{profiler}\n{self.frames.dropped} frames dropped"
+            )
+
+    def update_tuner(self):
+        if self.auto_increment.value and not self.auto_steps:
+            self.tuner.steps = self.increment.value
+        self.tuner.fps = self.target_fps.value
+        self.auto_steps = self.auto_increment.value
 
     def clear_tr(self):
         del self.worker
@@ -41,7 +99,6 @@ class ModelControler(QWidget):
             self.create_tr()
         self.play.clicked.disconnect()
         self.worker = self.play_click_worker()
-        self.worker.yielded.connect(self.update_layer)
         self.worker.finished.connect(self.clear_tr)
         self.worker.paused.connect(self.pause_tr)
         self.worker.start()
@@ -66,6 +123,50 @@ class ModelControler(QWidget):
             self.play.clicked.connect(self.play_click)
             self.create_tr()
 
+    def _running(self):
+        return hasattr(self, "worker") and not self.worker.is_paused
+
+    def save_checkpoint_click(self):
+        if self._running():
+            print("Pause the simulation to save a checkpoint")
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save checkpoint", "", "Checkpoints (*.ntc);;All files (*)"
+        )
+        if path:
+            self.tr.save_checkpoint(path)
+
+    def load_checkpoint_click(self):
+        if self._running():
+            print("Pause the simulation to load a checkpoint")
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Load checkpoint", "", "Checkpoints (*.ntc);;All files (*)"
+        )
+        if not path:
+            return
+        try:
+            tr = self.current_model.load_checkpoint(path)
+        except ValueError as e:
+            print(e)
+            return
+        # The widgets are set before the model is replaced so that their
+        # callbacks do not overwrite the loaded values
+        for name, (val, exp, _) in self.params.items():
+            if val is not None and np.isscalar(tr[name]):
+                val.value = tr[name] / exp
+        self.boundaries.value = tr.boundaries
+        self.direction.value = tr.kernel
+        self.volume.value = tr.ndim == 3
+        self.tr = tr
+        self.show_volume()
+        self.update_profiling()
+        self.change_display_concentration()
+
+    def show_volume(self):
+        if self.tr.ndim == 3:
+            self.viewer.dims.ndisplay = 3
+
     def reset_all_values_click(self):
         for val, _, default_val in self.params.values():
             val.value = default_val
@@ -85,8 +186,10 @@ class ModelControler(QWidget):
     def change_display_concentration(self):
         if "Concentration" in self.viewer.layers:
             self.viewer.layers.remove("Concentration")
+        self.displayed = self.concentration_show.value
+        self.frames.clear()
         self.image_layer = self.viewer.add_image(
-            self.tr[self.concentration_show.value],
+            self.tr[self.displayed].copy(),
             cache=False,
             name="Concentration",
             colormap=self.current_model.default_color_map,
@@ -140,13 +243,37 @@ class ModelControler(QWidget):
             self.viewer.layers.remove("Concentration")
         concentrations = {c: None for c in self.possible_concentrations}
         if self.randomize:
-            if 0 < len(self.viewer.layers):
-                if self.viewer.layers.selection.active:
-                    l = self.viewer.layers.selection.active
-                    concentrations[self.possible_concentrations[0]] = l.data
+            ndim = 3 if self.volume.value else 2
+            # The labelled cells of the first Labels layer are the domain
+            domain = None
+            if self.use_labels.value:
+                labels = [
+                    layer
+                    for layer in self.viewer.layers
+                    if isinstance(layer, Labels)
+                ]
+                if not labels:
+                    print("No Labels layer, running on the whole grid")
+                elif labels[0].data.ndim != ndim:
+                    print(
+                        f"The Labels layer is {labels[0].data.ndim}D, "
+                        f"running on the whole {ndim}D grid"
+                    )
                 else:
-                    l = self.viewer.layers[0]
-                    concentrations[self.possible_concentrations[0]] = l.data
+                    domain = labels[0]
+            # The Labels layers are domains, not initial states
+            images = [
+                layer
+                for layer in self.viewer.layers
+                if not (self.use_labels.value and isinstance(layer, Labels))
+            ]
+            if 0 < len(images):
+                active = self.viewer.layers.selection.active
+                if active in images:
+                    l = active
+                else:
+                    l = images[0]
+                concentrations[self.possible_concentrations[0]] = l.data
                 self.viewer.layers.remove(l)
             params = {}
             for name, v in self.params.items():
@@ -158,13 +285,17 @@ class ModelControler(QWidget):
             #     name: v[0].value * v[1] for name, v in self.params.items()
             # }
             self.tr = self.current_model(
-                concentrations=concentrations, **params
+                concentrations=concentrations,
+                ndim=ndim,
+                mask=None if domain is None else domain.data,
+                **params,
             )
         else:
             self.tr.reset()
         self.randomize = True
+        self.frames.clear()
         self.image_layer = self.viewer.add_image(
-            self.tr[self.concentration_show.value],
+            self.tr[self.displayed].copy(),
             cache=False,
             name="Concentration",
             colormap=self.current_model.default_color_map,
@@ -173,6 +304,9 @@ class ModelControler(QWidget):
         )
         self.tr.boundaries = self.boundaries.value
         self.tr.kernel = self.direction.value
+        self.show_volume()
+        if self.profile_box.value:
+            self.tr.profile()
         for l in self.viewer.layers:
             l.refresh()
 
@@ -191,6 +325,15 @@ class ModelControler(QWidget):
         new_run.clicked.connect(self.new_run)
         reset_values = self.create_button("Reset values")
         reset_values.clicked.connect(self.reset_all_values_click)
+        save_checkpoint = self.create_button("Save checkpoint")
+        save_checkpoint.clicked.connect(self.save_checkpoint_click)
+        load_checkpoint = self.create_button("Load checkpoint")
+        load_checkpoint.clicked.connect(self.load_checkpoint_click)
+        checkpoint_w = widgets.Container(
+            widgets=[save_checkpoint, load_checkpoint],
+            labels=False,
+            layout="horizontal",
+        )
         control_w = widgets.Container(
             widgets=[self.play, pause, stop, new_run],
             labels=False,
@@ -222,14 +365,14 @@ class ModelControler(QWidget):
 
         label_b = widgets.Label(value="Boundary conditions")
         self.boundaries = widgets.RadioButtons(
-            value=Boundaries.Closed,
+            value=self.current_model.default_boundaries,
             choices=Boundaries,
         )
         self.boundaries.changed.connect(self.update_values)
 
         label_d = widgets.Label(value="Diffusion direction")
         self.direction = widgets.ComboBox(
-            value=DiffusionDirection.Isotrope,
+            value=self.current_model.default_kernel,
             choices=DiffusionDirection,
         )
         self.direction.changed.connect(self.update_values)
@@ -242,6 +385,37 @@ class ModelControler(QWidget):
             is_float=False,
         )
 
+        self.steps_per_second, steps_per_second_w = self.create_slider(
+            "Steps per second (0: as fast as possible)",
+            value=0,
+            min=0,
+            max=100000,
+            change_connect=self.update_rate,
+            is_float=False,
+        )
+        self.rate_limiter = RateLimiter()
+
+        # Steps per frame adjusted to the speed of the simulation
+        self.auto_increment = widgets.CheckBox(
+            value=False, text="Automatic number of steps per frame"
+        )
+        self.auto_increment.changed.connect(self.update_tuner)
+        self.target_fps, target_fps_w = self.create_slider(
+            "Target frames per second",
+            value=30,
+            min=1,
+            max=120,
+            change_connect=self.update_tuner,
+            is_float=False,
+        )
+        self.auto_steps = False
+        self.tuner = StepTuner(
+            fps=self.target_fps.value,
+            steps=self.increment.value,
+            min_steps=self.current_model.increment.min,
+            max_steps=self.current_model.increment.max,
+        )
+
         label_display = widgets.Label(value="Concentration to display")
         self.possible_concentrations = self.current_model._concentration_names
         self.concentration_show = widgets.ComboBox(
@@ -251,6 +425,29 @@ class ModelControler(QWidget):
         self.concentration_show.changed.connect(
             self.change_display_concentration
         )
+        # Volumes of size^3 cells, taken into account by the next run
+        self.volume = widgets.CheckBox(value=False, text="3D volume")
+        self.volume.enabled = 3 in self.current_model._ndims
+        # Domain drawn in a Labels layer, taken into account by the next run
+        self.use_labels = widgets.CheckBox(
+            value=False, text="Restrict to the Labels layer"
+        )
+        # Time spent in each phase, shown every `profile_every` ms
+        self.profile_box = widgets.CheckBox(value=False, text="Profile")
+        self.profile_box.changed.connect(self.update_profiling)
+        self.profile_label = widgets.Label(value="")
+        self.profile_timer = QTimer(self)
+        self.profile_timer.setInterval(self.profile_every)
+        self.profile_timer.timeout.connect(self.show_profile)
+        self.profile_timer.start()
+
+        # Concentration published by the simulation thread
+        self.displayed = self.concentration_show.value
+        self.frames = FrameBuffer()
+        self.display_timer = QTimer(self)
+        self.display_timer.setInterval(int(1000 / self.display_rate))
+        self.display_timer.timeout.connect(self.pull_frame)
+        self.display_timer.start()
 
         self.randomize = True
         self.create_tr()
@@ -267,7 +464,20 @@ class ModelControler(QWidget):
             widgets=[label_d, self.direction], labels=False
         )
         geometry_widget = widgets.Container(
-            widgets=[widget_display, increment_w, widget_b, widget_d],
+            widgets=[
+                widget_display,
+                increment_w,
+                self.auto_increment,
+                target_fps_w,
+                steps_per_second_w,
+                widget_b,
+                widget_d,
+                self.volume,
+                self.use_labels,
+                checkpoint_w,
+                self.profile_box,
+                self.profile_label,
+            ],
             layout="vertical",
             labels=False,
         )